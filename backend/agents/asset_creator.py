@@ -1,17 +1,51 @@
 """Asset creator: on-brand image prompts from profile (trybloom.ai-style)."""
+import json
 import logging
-from typing import Any
+import math
+import re
+from typing import Any, Iterator
 
-from services.anthropic_client import CLAUDE_MODEL, get_anthropic_client
+from services.anthropic_client import get_anthropic_client, parse_claude_response
+from services.model_router import run_step, stream_step
+from services.prompt_context import compact_json, compact_profile, record_context
 
 logger = logging.getLogger(__name__)
 
+VARIANT_PACK_SIZE = 8
+DIMENSIONS_RE = re.compile(r"^\s*(\d+)\s*[x×*]\s*(\d+)\s*$", re.IGNORECASE)
+
+
+def format_clause(dimensions: str) -> str:
+    """Dimension-specific framing appended locally, so variants that differ only by size share one model output."""
+    m = DIMENSIONS_RE.match(dimensions or "")
+    if not m:
+        return f"Format: {dimensions}."
+    w, h = int(m.group(1)), int(m.group(2))
+    g = math.gcd(w, h) or 1
+    if w == h:
+        layout = "square format, centered balanced composition"
+    elif h > w:
+        layout = "vertical portrait format, subject centered with headroom for text at top and bottom"
+    else:
+        layout = "wide landscape format, subject offset to one side leaving negative space for copy"
+    return f"Format: {w}x{h} ({w // g}:{h // g}), {layout}."
+
+
+def _json_line(line: str) -> Any:
+    line = line.strip().rstrip(",")
+    if not line.startswith("{"):
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
 
 class AssetCreatorAgent:
     def __init__(self) -> None:
         self.client = get_anthropic_client()
 
-    def generate_prompt(self, brand_profile: dict[str, Any], asset_type: str, dimensions: str, copy: str | None = None) -> str:
+    def _brand_brief(self, brand_profile: dict[str, Any]) -> str:
         primary = brand_profile.get("primary_colors") or []
         secondary = brand_profile.get("secondary_colors") or []
         style = brand_profile.get("style") or ""
@@ -19,9 +53,14 @@ class AssetCreatorAgent:
         mood = brand_profile.get("mood") or []
         primary_hex = [c for c in (primary if isinstance(primary, list) else [primary]) if isinstance(c, str) and c.startswith("#")]
         secondary_hex = [c for c in (secondary if isinstance(secondary, list) else [secondary]) if isinstance(c, str) and c.startswith("#")]
-        brief = f"""Brand: Primary colors (hex): {", ".join(primary_hex) or "none"}. Secondary: {", ".join(secondary_hex) or "none"}. Style: {style}. Fonts: {", ".join(str(f) for f in (fonts[:5] if isinstance(fonts, list) else [])) or "none"}. Mood: {", ".join(str(m) for m in (mood[:5] if isinstance(mood, list) else [])) or "none"}."""
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
+        return f"""Brand: Primary colors (hex): {", ".join(primary_hex) or "none"}. Secondary: {", ".join(secondary_hex) or "none"}. Style: {style}. Fonts: {", ".join(str(f) for f in (fonts[:5] if isinstance(fonts, list) else [])) or "none"}. Mood: {", ".join(str(m) for m in (mood[:5] if isinstance(mood, list) else [])) or "none"}."""
+
+    def generate_prompt(self, brand_profile: dict[str, Any], asset_type: str, dimensions: str, copy: str | None = None) -> str:
+        brief = self._brand_brief(brand_profile)
+        return run_step(
+            self.client,
+            "AssetCreatorAgent.generate_prompt",
+            validate=lambda text: len(text) >= 40,
             max_tokens=800,
             messages=[{
                 "role": "user",
@@ -30,15 +69,112 @@ Asset type: {asset_type}. Dimensions: {dimensions}. Copy: {copy or "none"}.
 Write one detailed image prompt for Flux/Replicate. Use the exact hex colors. Plain text only.""",
             }],
         )
-        text = "".join(getattr(b, "text", "") for b in response.content)
-        return text.strip()
+
+    def iter_prompt_variants(
+        self,
+        brand_profile: dict[str, Any],
+        asset_types: list[str],
+        dimensions: list[str],
+        copy_texts: list[str | None],
+        pack_size: int = VARIANT_PACK_SIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """Prompts for every asset_type x dimensions x copy_text combination, yielded as each arrives.
+
+        Only the (asset_type, copy) pairs go to the model, packed `pack_size` per call with the brand
+        brief sent once per call; each pair is expanded across all dimensions by local templating.
+        A variant still missing after one retry is yielded with "error": "not generated" instead of a prompt.
+        """
+        bases = [(a, c) for a in dict.fromkeys(asset_types) for c in dict.fromkeys(copy_texts)]
+        dims = list(dict.fromkeys(dimensions))
+        brief = self._brand_brief(brand_profile)
+        done: set[int] = set()
+
+        def accept(obj: Any, chunk: dict[int, tuple[str, str | None]]) -> Iterator[dict[str, Any]]:
+            try:
+                base_id, prompt = int(obj["id"]), obj["prompt"]
+            except (KeyError, TypeError, ValueError):
+                return
+            if base_id not in chunk or base_id in done or not isinstance(prompt, str) or not prompt.strip():
+                return
+            done.add(base_id)
+            asset_type, copy = bases[base_id]
+            for d in dims:
+                yield {"asset_type": asset_type, "dimensions": d, "copy_text": copy, "prompt": f"{prompt.strip()} {format_clause(d)}"}
+
+        for start in range(0, len(bases), pack_size):
+            chunk = {i: bases[i] for i in range(start, min(start + pack_size, len(bases)))}
+            buffer = ""
+            for delta in stream_step(
+                self.client,
+                "AssetCreatorAgent.generate_prompt_variants",
+                max_tokens=350 * len(chunk) + 200,
+                messages=[{"role": "user", "content": self._variants_message(brief, chunk, one_per_line=True)}],
+            ):
+                buffer += delta
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    yield from accept(_json_line(line), chunk)
+            yield from accept(_json_line(buffer), chunk)
+
+            missing = {i: b for i, b in chunk.items() if i not in done}
+            if missing:
+                logger.info("Retrying %d asset variants missing from packed response", len(missing))
+                out = run_step(
+                    self.client,
+                    "AssetCreatorAgent.generate_prompt_variants",
+                    parse=parse_claude_response,
+                    validate=lambda out: {str(v.get("id")) for v in out.get("variants") or [] if isinstance(v, dict)} >= {str(i) for i in missing},
+                    max_tokens=350 * len(missing) + 200,
+                    messages=[{"role": "user", "content": self._variants_message(brief, missing, one_per_line=False)}],
+                )
+                for v in out.get("variants") or []:
+                    yield from accept(v, missing)
+                for i, (asset_type, copy) in missing.items():
+                    if i not in done:
+                        # Explicit error lines let clients tell a partial stream from a complete one.
+                        for d in dims:
+                            yield {"asset_type": asset_type, "dimensions": d, "copy_text": copy, "error": "not generated"}
+
+    @staticmethod
+    def _variants_message(brief: str, chunk: dict[int, tuple[str, str | None]], one_per_line: bool) -> str:
+        items = "\n".join(f"{i}: asset type {a}; copy: {c or 'none'}" for i, (a, c) in chunk.items())
+        shape = (
+            'Output one JSON object per line, nothing else: {"id": <id>, "prompt": "..."}'
+            if one_per_line
+            else 'Return JSON: {"variants": [{"id": <id>, "prompt": "..."}, ...]}'
+        )
+        return f"""{brief}
+Write one detailed image prompt for Flux/Replicate for each variant below. Use the exact hex colors. Do not mention size, aspect ratio or orientation.
+{items}
+{shape}"""
+
+    def generate_transform_prompt(self, brand_profile: dict[str, Any], descriptor: dict[str, Any], asset_type: str = "social") -> str:
+        """img2img prompt for an uploaded photo, from its compact descriptor (size, palette vs brand colors)."""
+        photo = compact_json({k: v for k, v in descriptor.items() if k != "pyramid"}, max_list=6)
+        return run_step(
+            self.client,
+            "AssetCreatorAgent.generate_transform_prompt",
+            validate=lambda text: len(text) >= 40,
+            max_tokens=600,
+            messages=[{
+                "role": "user",
+                "content": f"""{self._brand_brief(brand_profile)}
+Uploaded photo (measured locally): {photo}
+Asset type: {asset_type}.
+Write one image-to-image prompt for Flux/Replicate that restyles this photo on-brand: keep the subject, shift off-brand colors toward the nearest brand colors, match the mood. Plain text only.""",
+            }],
+        )
 
     def suggest_formats(self, brand_profile: dict[str, Any]) -> list[dict[str, Any]]:
-        from services.anthropic_client import parse_claude_response
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
+        brand = compact_profile(brand_profile)
+        record_context("AssetCreatorAgent.suggest_formats", str(brand_profile), brand)
+        result = run_step(
+            self.client,
+            "AssetCreatorAgent.suggest_formats",
+            parse=parse_claude_response,
+            validate=lambda out: any(isinstance(f, dict) and f.get("width") and f.get("height") for f in out.get("formats") or []),
             max_tokens=1000,
-            messages=[{"role": "user", "content": f"Brand: {brand_profile}. Return JSON: {{ \"formats\": [ {{ \"name\": \"Instagram Post\", \"width\": 1080, \"height\": 1080 }}, ... ] }}"}],
+            messages=[{"role": "user", "content": f"Brand: {brand}. Return JSON: {{ \"formats\": [ {{ \"name\": \"Instagram Post\", \"width\": 1080, \"height\": 1080 }}, ... ] }}"}],
         )
-        result = parse_claude_response(response)
-        return result.get("formats") or []
+        formats = result.get("formats") if isinstance(result.get("formats"), list) else []
+        return [f for f in formats if isinstance(f, dict)]
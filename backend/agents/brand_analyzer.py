@@ -1,13 +1,24 @@
 """Brand analyzer agent: extracts brand identity (colors, fonts, logos, style) from URL — trybloom.ai-style."""
+import asyncio
 import logging
+import os
 import re
+import time
+from collections import Counter
 from typing import Any
-from urllib.parse import urljoin
+from urllib.parse import urldefrag, urljoin, urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
-from services.anthropic_client import CLAUDE_MODEL, get_anthropic_client, parse_claude_response
+from services.anthropic_client import get_anthropic_client, parse_claude_response
+from services.brand_index import get_brand_index
+from services.color import merge_palettes
+from services.logo_palette import MAX_LOGO_BYTES, extract_logo_palette
+from services.model_router import run_step
+from services.profiling import stage
+from services.prompt_context import ContextBuilder, dedupe_sentences, record_context
+from services.stylesheet_index import StylesheetIndex, content_digest, get_stylesheet_index, site_domain
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +27,11 @@ RGB_RE = re.compile(r"rgba?\s*\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*[\d.]+
 CSS_VAR_HEX_RE = re.compile(r"--[a-zA-Z0-9-]+\s*:\s*#(?:[0-9a-fA-F]{3}){1,2}\b")
 CSS_VAR_RGB_RE = re.compile(r"--[a-zA-Z0-9-]+\s*:\s*rgba?\s*\([^)]+\)", re.IGNORECASE)
 FONT_FAMILY_RE = re.compile(r"font-family\s*:\s*([^;}+]+)", re.IGNORECASE)
+KEY_PAGE_RE = re.compile(r"about|pricing|product|feature|solution|service|brand|company|story|team|platform", re.IGNORECASE)
+SITEMAP_LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+SKIP_LINK_RE = re.compile(r"\.(?:pdf|zip|jpe?g|png|gif|svg|webp|mp4|xml)$|/(?:login|signin|signup|cart|checkout|terms|privacy|legal|cookies?)\b", re.IGNORECASE)
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "6"))
+CRAWL_TIME_BUDGET = float(os.getenv("CRAWL_TIME_BUDGET", "8"))
 
 
 def _normalize_hex(c: str) -> str:
@@ -72,89 +88,299 @@ def _extract_css_fonts(css_text: str) -> list[str]:
     return found[:15]
 
 
-def _find_logo_url(soup: BeautifulSoup, base_url: str) -> str:
-    for meta in soup.find_all("meta", attrs={"property": re.compile(r"og:image", re.I)}):
-        content = meta.get("content", "").strip()
-        if content and content.startswith(("http", "//")):
-            return _resolve_url(base_url, content) if content.startswith("//") else content
+def _find_logo_url(soup: BeautifulSoup, base_url: str) -> tuple[str, str]:
+    """(url, source): an explicit logo <img> first, then the first header/nav image, and only then
+    og:image ("og:image" source), which is usually a social banner or photo rather than the logo."""
     for img in soup.find_all("img", src=True):
         src = img.get("src", "")
         if not src or src.startswith("data:"):
             continue
-        attrs = " ".join([str(img.get("class", [])), str(img.get("id", "")), str(img.get("alt", ""))]).lower()
+        attrs = " ".join([str(img.get("class", [])), str(img.get("id", "")), str(img.get("alt", "")), src]).lower()
         if "logo" in attrs:
-            return _resolve_url(base_url, src)
-    header = soup.find(["header", "nav"]) or soup.find("body")
+            return _resolve_url(base_url, src), "logo"
+    header = soup.find(["header", "nav"])
     if header:
         for img in header.find_all("img", src=True):
             src = img.get("src", "")
             if src and not src.startswith("data:"):
-                return _resolve_url(base_url, src)
-    return ""
+                return _resolve_url(base_url, src), "header"
+    for meta in soup.find_all("meta", attrs={"property": re.compile(r"og:image", re.I)}):
+        content = meta.get("content", "").strip()
+        if content and content.startswith(("http", "//")):
+            return (_resolve_url(base_url, content) if content.startswith("//") else content), "og:image"
+    body = soup.find("body")
+    if body:
+        for img in body.find_all("img", src=True):
+            src = img.get("src", "")
+            if src and not src.startswith("data:"):
+                return _resolve_url(base_url, src), "body"
+    return "", ""
+
+
+def _page_text_sections(soup: BeautifulSoup) -> dict[str, list[str]]:
+    """Visible copy grouped by how much it says about the brand: hero, headings, then body sentences."""
+    seen: set[str] = set()
+    hero_texts = [h.get_text(" ", strip=True) for h in soup.find_all("h1")[:3]]
+    hero_block = soup.find(["header", "section"], class_=re.compile(r"hero|banner|masthead", re.I))
+    if hero_block:
+        hero_texts.extend(p.get_text(" ", strip=True) for p in hero_block.find_all("p")[:3])
+    hero = dedupe_sentences(hero_texts, seen)
+    headings = dedupe_sentences([h.get_text(" ", strip=True) for h in soup.find_all(["h2", "h3"])[:20]], seen)
+    body = dedupe_sentences([t.get_text(" ", strip=True) for t in soup.find_all(["p", "li"])[:200]], seen)
+    return {"hero": hero, "headings": headings, "body": body}
+
+
+def _stylesheet_urls(soup: BeautifulSoup, base_url: str) -> list[str]:
+    css_urls = []
+    for link in soup.find_all("link", rel=re.compile(r"stylesheet", re.I))[:8]:
+        css_url = _resolve_url(base_url, link.get("href", ""))
+        if css_url and css_url not in css_urls:
+            css_urls.append(css_url)
+    return css_urls
+
+
+def _page_tokens(soup: BeautifulSoup, sheet_tokens: list[dict[str, list[str]]]) -> tuple[list[str], list[str]]:
+    """Colors and fonts one page uses: inline <style>, its stylesheets, then style attributes (first-seen order)."""
+    inline_css = "\n".join(tag.string for tag in soup.find_all("style") if tag.string)
+    colors = _extract_css_colors(inline_css) if inline_css else []
+    fonts = _extract_css_fonts(inline_css) if inline_css else []
+    for tokens in sheet_tokens:
+        colors.extend(tokens.get("colors") or [])
+        fonts.extend(tokens.get("fonts") or [])
+    for tag in soup.find_all(style=True):
+        colors.extend(_extract_css_colors(tag.get("style", "")))
+        fonts.extend(_extract_css_fonts(tag.get("style", "")))
+    return list(dict.fromkeys(colors)), list(dict.fromkeys(fonts))
+
+
+def _rank_by_pages(per_page: list[list[str]]) -> list[str]:
+    """Tokens ordered by how many pages use them; ties keep first-seen order (landing page first)."""
+    counts: Counter[str] = Counter()
+    first: dict[str, str] = {}
+    for tokens in per_page:
+        keys = {t.lower() for t in tokens}
+        counts.update(keys)
+        for t in tokens:
+            first.setdefault(t.lower(), t)
+    return sorted(first.values(), key=lambda t: -counts[t.lower()])
+
+
+def _same_site(url: str, base_url: str) -> bool:
+    host, base = urlparse(url).netloc.lower(), urlparse(base_url).netloc.lower()
+    return bool(host) and host.removeprefix("www.") == base.removeprefix("www.")
+
+
+def _nav_links(soup: BeautifulSoup, base_url: str) -> list[str]:
+    """Same-site key-page links (about, pricing, product...) from header/nav/footer, in page order."""
+    links: list[str] = []
+    for block in soup.find_all(["header", "nav", "footer"]) or [soup]:
+        for a in block.find_all("a", href=True):
+            href = urldefrag(_resolve_url(base_url, a["href"].strip()))[0].rstrip("/")
+            if (
+                href.startswith("http")
+                and _same_site(href, base_url)
+                and KEY_PAGE_RE.search(urlparse(href).path)
+                and not SKIP_LINK_RE.search(href)
+                and href not in links
+            ):
+                links.append(href)
+    return links
+
+
+async def _sitemap_links(client: httpx.AsyncClient, base_url: str) -> list[str]:
+    try:
+        r = await client.get(urljoin(base_url, "/sitemap.xml"), timeout=5.0)
+        if not r.is_success:
+            return []
+    except Exception as e:
+        logger.debug("No sitemap for %s: %s", base_url, e)
+        return []
+    urls = [u.rstrip("/") for u in SITEMAP_LOC_RE.findall(r.text[:500000])]
+    # Key pages only: a full sitemap is mostly blog posts and docs.
+    return [u for u in urls if _same_site(u, base_url) and KEY_PAGE_RE.search(urlparse(u).path) and not SKIP_LINK_RE.search(u)]
+
+
+async def _discover_pages(client: httpx.AsyncClient, soup: BeautifulSoup, base_url: str, limit: int) -> list[str]:
+    home = base_url.rstrip("/")
+    candidates = [u for u in _nav_links(soup, base_url) if u != home]
+    if len(candidates) < limit:
+        candidates += [u for u in await _sitemap_links(client, base_url) if u != home and u not in candidates]
+    return candidates[:limit]
+
+
+async def _fetch_stylesheet_tokens(
+    client: httpx.AsyncClient, css_url: str, index: StylesheetIndex, domain: str, seen: dict[str, dict[str, list[str]]] | None = None
+) -> dict[str, list[str]]:
+    """Colors/fonts of one linked stylesheet; known framework sheets are skipped or answered from the index.
+
+    `seen` maps content digests already parsed during this analysis, so the same bundle served under
+    another URL (cache-busting query, CDN mirror) is not parsed twice.
+    """
+    known = index.match_url(css_url)
+    if known:
+        logger.debug("Skipping %s stylesheet %s", known["library"], css_url)
+        return known["summary"]
+    try:
+        r2 = await client.get(css_url, timeout=15.0)
+        if not r2.is_success or not r2.content:
+            return {"colors": [], "fonts": []}
+    except Exception as e:
+        logger.debug("Could not fetch CSS %s: %s", css_url, e)
+        return {"colors": [], "fonts": []}
+    digest = content_digest(r2.content)
+    if seen is not None and digest in seen:
+        return seen[digest]
+    known = index.match_content(digest)
+    if known:
+        summary = known["summary"]
+    else:
+        css_text = r2.text[:50000]
+        summary = {"colors": _extract_css_colors(css_text), "fonts": _extract_css_fonts(css_text)}
+    index.record(digest, css_url, domain, summary)
+    if seen is not None:
+        seen[digest] = summary
+    return summary
+
+
+async def _fetch_logo_palette(client: httpx.AsyncClient, logo_url: str) -> list[str]:
+    """Download the logo (raster or SVG) and return its dominant colors, computed locally."""
+    if not logo_url:
+        return []
+    try:
+        r = await client.get(logo_url, timeout=10.0)
+        if not r.is_success or not r.content or len(r.content) > MAX_LOGO_BYTES:
+            return []
+    except Exception as e:
+        logger.debug("Could not fetch logo %s: %s", logo_url, e)
+        return []
+    return await asyncio.to_thread(extract_logo_palette, r.content, r.headers.get("content-type", ""))
 
 
 class BrandAnalyzer:
     def __init__(self) -> None:
         self.client = get_anthropic_client()
 
-    async def analyze_website(self, url: str) -> dict[str, Any]:
+    async def analyze_website(
+        self, url: str, crawl: bool = False, max_pages: int = CRAWL_MAX_PAGES, time_budget: float = CRAWL_TIME_BUDGET
+    ) -> dict[str, Any]:
+        """Analyze the landing page; with crawl=True also up to max_pages key pages (about, pricing,
+        product...) found in the nav or sitemap, fetched concurrently within time_budget seconds.
+        Stylesheets shared across pages are downloaded and parsed once, and tokens are ranked by
+        how many pages use them."""
+        started = time.monotonic()
         async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            html = resp.text
-        soup = BeautifulSoup(html, "html.parser")
-        base_url = str(resp.url) if hasattr(resp.url, "__str__") else url
-
-        css_parts = []
-        for tag in soup.find_all("style"):
-            if tag.string:
-                css_parts.append(tag.string)
-        for link in soup.find_all("link", rel=re.compile(r"stylesheet", re.I))[:8]:
-            href = link.get("href", "")
-            if not href:
-                continue
-            try:
-                css_url = _resolve_url(base_url, href)
-                if not css_url or css_url.startswith("data:"):
-                    continue
-                r2 = await httpx.AsyncClient(follow_redirects=True, timeout=15.0).get(css_url)
-                if r2.is_success and r2.text:
-                    css_parts.append(r2.text[:50000])
-            except Exception as e:
-                logger.debug("Could not fetch CSS %s: %s", href, e)
-
-        full_css = "\n".join(css_parts)
-        extracted_colors = _extract_css_colors(full_css)
-        extracted_fonts = _extract_css_fonts(full_css)
-        for tag in soup.find_all(style=True):
-            extracted_colors.extend(_extract_css_colors(tag.get("style", "")))
-            extracted_fonts.extend(_extract_css_fonts(tag.get("style", "")))
-        extracted_colors = list(dict.fromkeys(extracted_colors))[:12]
-        extracted_fonts = list(dict.fromkeys(extracted_fonts))[:15]
-        logo_url = _find_logo_url(soup, base_url)
-
-        title = soup.title.string if soup.title else ""
-        meta_desc = ""
-        for tag in soup.find_all("meta", attrs={"name": "description"}):
-            if tag.get("content"):
-                meta_desc = tag["content"][:500]
-                break
-        body_text = soup.get_text(separator=" ", strip=True)[:3000] if soup.body else ""
-
-        context = f"""URL: {url}
+            with stage("fetch"):
+                resp = await client.get(url)
+                resp.raise_for_status()
+                html = resp.text
+            with stage("parse"):
+                soup = BeautifulSoup(html, "html.parser")
+            base_url = str(resp.url) if hasattr(resp.url, "__str__") else url
+
+            index = get_stylesheet_index()
+            domain = site_domain(base_url)
+            digests: dict[str, dict[str, list[str]]] = {}
+            sheets: dict[str, asyncio.Task] = {}
+
+            def sheet(css_url: str) -> asyncio.Task:
+                # One download per stylesheet URL, however many pages link it.
+                if css_url not in sheets:
+                    sheets[css_url] = asyncio.ensure_future(_fetch_stylesheet_tokens(client, css_url, index, domain, digests))
+                return sheets[css_url]
+
+            async def crawl_page(page_url: str) -> tuple[str, list[str], list[str]] | None:
+                try:
+                    r = await client.get(page_url, timeout=10.0)
+                    if not r.is_success or "html" not in r.headers.get("content-type", "html"):
+                        return None
+                except Exception as e:
+                    logger.debug("Could not fetch page %s: %s", page_url, e)
+                    return None
+                page = BeautifulSoup(r.text, "html.parser")
+                # Shielded: a page cut off by the time budget must not cancel a sheet other pages share.
+                tokens = await asyncio.gather(*(asyncio.shield(sheet(u)) for u in _stylesheet_urls(page, str(r.url))))
+                colors, fonts = _page_tokens(page, tokens)
+                title = page.title.string.strip() if page.title and page.title.string else ""
+                return title, colors, fonts
+
+            logo_url, logo_source = _find_logo_url(soup, base_url)
+            with stage("fetch_assets"):
+                pending = [asyncio.ensure_future(_fetch_logo_palette(client, logo_url))]
+                pending += [sheet(u) for u in _stylesheet_urls(soup, base_url)]
+                crawled = []
+                if crawl and max_pages > 0:
+                    page_urls = await _discover_pages(client, soup, base_url, max_pages)
+                    page_tasks = [asyncio.ensure_future(crawl_page(u)) for u in page_urls]
+                    if page_tasks:
+                        remaining = max(0.5, time_budget - (time.monotonic() - started))
+                        done, late = await asyncio.wait(page_tasks, timeout=remaining)
+                        for task in late:
+                            task.cancel()
+                        crawled = [t.result() for t in page_tasks if t in done and not t.exception() and t.result()]
+                        logger.info("Crawled %d/%d pages of %s (%d stylesheets, %d unique)", len(crawled), len(page_urls), domain, len(sheets), len(digests))
+                image_colors, *sheet_tokens = await asyncio.gather(*pending)
+                for task in sheets.values():
+                    task.cancel()
+        await asyncio.to_thread(index.save)
+
+        with stage("extract"):
+            colors, fonts = _page_tokens(soup, sheet_tokens)
+            extracted_colors = _rank_by_pages([colors] + [c for _, c, _ in crawled])
+            extracted_fonts = _rank_by_pages([fonts] + [f for _, _, f in crawled])
+            # Only an actual logo image outranks the CSS; og:image colors (banner/photo) just fill in after it.
+            if logo_source in ("logo", "header"):
+                logo_colors, extracted_colors = image_colors, merge_palettes(image_colors, extracted_colors, limit=12)
+            else:
+                logo_colors, extracted_colors = [], merge_palettes(extracted_colors, image_colors[:2], limit=12)
+            extracted_fonts = extracted_fonts[:15]
+
+            title = soup.title.string if soup.title else ""
+            meta_desc = ""
+            for tag in soup.find_all("meta", attrs={"name": "description"}):
+                if tag.get("content"):
+                    meta_desc = tag["content"][:500]
+                    break
+
+            sections = _page_text_sections(soup) if soup.body else {"hero": [], "headings": [], "body": []}
+
+            builder = ContextBuilder()
+            builder.add("URL", url, priority=0)
+            builder.add("Page title", title or "", priority=0)
+            builder.add("Meta description", meta_desc, priority=1)
+            builder.add("Logo colors (hex, measured from the logo image)", ", ".join(logo_colors) or "none", priority=0)
+            builder.add("Extracted colors (hex, ranked)", ", ".join(extracted_colors[:8]), priority=0)
+            builder.add("Extracted fonts", ", ".join(extracted_fonts[:6]), priority=1)
+            builder.add("Logo URL", logo_url, priority=3)
+            builder.add("Other pages analyzed", " | ".join(t for t, _, _ in crawled if t), priority=3)
+            builder.add("Hero", " | ".join(sections["hero"]), priority=2)
+            builder.add("Headings", " | ".join(sections["headings"]), priority=3)
+            builder.add("Body excerpt", " ".join(sections["body"]), priority=4)
+            context, _ = builder.build()
+            # Baseline: the context the previous prompt sent (full lists plus a raw 3000-character page excerpt).
+            body_text = soup.get_text(separator=" ", strip=True)[:3000] if soup.body else ""
+            legacy_context = f"""URL: {url}
 Page title: {title}
 Meta description: {meta_desc}
 Extracted from CSS/HTML: colors (hex) = {extracted_colors}, fonts = {extracted_fonts}, logo_url = {logo_url or 'none'}
 Body excerpt: {body_text}
 """
+            record_context("BrandAnalyzer.analyze_website", legacy_context, context)
+
+        def _confident(out: dict[str, Any]) -> bool:
+            # Low confidence: no style, or primaries that ignore every color we actually measured.
+            primaries = [str(c).lower() for c in out.get("primary_colors") or [] if isinstance(c, str)]
+            return bool(out.get("style")) and bool(primaries) and (not extracted_colors or any(c in extracted_colors for c in primaries))
 
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
+        result = run_step(
+            self.client,
+            "BrandAnalyzer.analyze_website",
+            parse=parse_claude_response,
+            validate=_confident,
             max_tokens=2000,
             messages=[{
                 "role": "user",
                 "content": f"""Analyze this website and return JSON only:
-- primary_colors: [hex from extracted list, 1-3 main]
+- primary_colors: [hex from extracted list, 1-3 main; prefer logo colors]
 - secondary_colors: [hex from extracted list, 1-3]
 - fonts: [from extracted list or infer]
 - style: short description
@@ -166,21 +392,29 @@ Use the extracted colors/fonts when possible. Website:
 """,
             }],
         )
-        result = parse_claude_response(response)
-        result["url"] = url
-        if logo_url:
-            result["logo_url"] = logo_url
-        def _ensure_hex_list(val: Any, fallback: list[str], max_len: int = 5) -> list[str]:
-            if isinstance(val, list) and val:
-                hexes = [str(x).strip() for x in val if isinstance(x, str) and x.startswith("#")]
-                if hexes:
-                    return hexes[:max_len]
-            return fallback[:max_len]
-        primary = _ensure_hex_list(result.get("primary_colors"), extracted_colors, 5)
-        result["primary_colors"] = primary if primary else (extracted_colors[:3] or [])
-        used = set(result["primary_colors"])
-        result["secondary_colors"] = _ensure_hex_list(result.get("secondary_colors"), [c for c in extracted_colors if c not in used], 5) or [c for c in extracted_colors if c not in used][:3]
-        fonts_raw = result.get("fonts")
-        result["fonts"] = ([str(f).strip() for f in fonts_raw if f][:10] if isinstance(fonts_raw, list) and fonts_raw else extracted_fonts[:10] or [])
+        with stage("post_process"):
+            result["url"] = url
+            if crawled:
+                result["pages_analyzed"] = 1 + len(crawled)
+            if logo_url:
+                result["logo_url"] = logo_url
+            if logo_colors:
+                result["logo_colors"] = logo_colors
+            def _ensure_hex_list(val: Any, fallback: list[str], max_len: int = 5) -> list[str]:
+                if isinstance(val, list) and val:
+                    hexes = [str(x).strip() for x in val if isinstance(x, str) and x.startswith("#")]
+                    if hexes:
+                        return hexes[:max_len]
+                return fallback[:max_len]
+            primary = _ensure_hex_list(result.get("primary_colors"), logo_colors or extracted_colors, 5)
+            result["primary_colors"] = primary if primary else (extracted_colors[:3] or [])
+            used = set(result["primary_colors"])
+            result["secondary_colors"] = _ensure_hex_list(result.get("secondary_colors"), [c for c in extracted_colors if c not in used], 5) or [c for c in extracted_colors if c not in used][:3]
+            fonts_raw = result.get("fonts")
+            result["fonts"] = ([str(f).strip() for f in fonts_raw if f][:10] if isinstance(fonts_raw, list) and fonts_raw else extracted_fonts[:10] or [])
+            try:
+                get_brand_index().add(result)
+            except Exception as e:
+                logger.warning("Could not index brand %s: %s", url, e)
         logger.info("Brand analysis done for %s (logo=%s)", url, bool(logo_url))
         return result
@@ -1,24 +1,57 @@
 """Design system agent: style guide from brand profile."""
 from typing import Any
 
-from services.anthropic_client import CLAUDE_MODEL, get_anthropic_client, parse_claude_response
+from services.anthropic_client import get_anthropic_client, parse_claude_response
+from services.design_tokens import build_style_guide, to_css_variables, to_style_dictionary, to_tailwind_config
+from services.model_router import run_step
+from services.prompt_context import compact_json, record_context
 
 
 class DesignSystemAgent:
     def __init__(self) -> None:
-        self.client = get_anthropic_client()
+        self._client = None
 
-    def generate_style_guide(self, brand_profile: dict[str, Any]) -> dict[str, Any]:
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=2000,
+    @property
+    def client(self):
+        # Only the optional prose guidance needs Claude; the tokens themselves are computed locally.
+        if self._client is None:
+            self._client = get_anthropic_client()
+        return self._client
+
+    def generate_style_guide(self, brand_profile: dict[str, Any], include_guidance: bool = False) -> dict[str, Any]:
+        style_guide = build_style_guide(brand_profile)
+        if include_guidance:
+            style_guide["guidance"] = self.generate_guidance(brand_profile, style_guide)
+        return style_guide
+
+    def generate_guidance(self, brand_profile: dict[str, Any], style_guide: dict[str, Any]) -> dict[str, Any]:
+        summary = {
+            "style": brand_profile.get("style"),
+            "mood": brand_profile.get("mood"),
+            "primary": style_guide["colors"]["primary"],
+            "secondary": style_guide["colors"]["secondary"],
+            "fonts": [style_guide["typography"]["headings"]["family"], style_guide["typography"]["body"]["family"]],
+        }
+        brand = compact_json(summary)
+        record_context("DesignSystemAgent.generate_guidance", str(brand_profile), brand)
+        return run_step(
+            self.client,
+            "DesignSystemAgent.generate_guidance",
+            parse=parse_claude_response,
+            validate=bool,
+            max_tokens=800,
             messages=[{
                 "role": "user",
-                "content": f"""Brand profile: {brand_profile}
-Return JSON style guide: colors (primary, secondary), typography (headings, body), spacing, logo_usage (clear_space, min_size, donots).""",
+                "content": f"""Brand: {brand}
+Colors, scales and contrast are already computed. Return JSON with short prose guidance only: voice, color_usage, typography_usage, imagery.""",
             }],
         )
-        return parse_claude_response(response)
 
     def export_tokens(self, style_guide: dict[str, Any]) -> dict[str, Any]:
-        return {"colors": style_guide.get("colors"), "typography": style_guide.get("typography")}
+        return {
+            "colors": style_guide.get("colors"),
+            "typography": style_guide.get("typography"),
+            "css": to_css_variables(style_guide),
+            "tailwind": to_tailwind_config(style_guide),
+            "style_dictionary": to_style_dictionary(style_guide),
+        }
@@ -2,7 +2,9 @@
 import logging
 from typing import Any
 
-from services.anthropic_client import CLAUDE_MODEL, get_anthropic_client, parse_claude_response
+from services.anthropic_client import get_anthropic_client, parse_claude_response
+from services.model_router import run_step
+from services.prompt_context import compact_json, compact_profile, record_context
 
 logger = logging.getLogger(__name__)
 
@@ -12,29 +14,42 @@ class LogoGeneratorAgent:
         self.client = get_anthropic_client()
 
     def analyze_strategy(self, brand_profile: dict[str, Any]) -> dict[str, Any]:
-        r = self.client.messages.create(
-            model=CLAUDE_MODEL,
+        brand = compact_profile(brand_profile)
+        record_context("LogoGeneratorAgent.analyze_strategy", str(brand_profile), brand)
+        return run_step(
+            self.client,
+            "LogoGeneratorAgent.analyze_strategy",
+            parse=parse_claude_response,
+            validate=lambda out: bool(out.get("positioning")),
             max_tokens=1500,
-            messages=[{"role": "user", "content": f"Brand profile: {brand_profile}\nReturn JSON: positioning, attributes (array), avoid (array), style_direction."}],
+            messages=[{"role": "user", "content": f"Brand profile: {brand}\nReturn JSON: positioning, attributes (array), avoid (array), style_direction."}],
         )
-        return parse_claude_response(r)
 
     def generate_concepts(self, strategy: dict[str, Any], count: int = 5) -> list[str]:
-        r = self.client.messages.create(
-            model=CLAUDE_MODEL,
+        brief = compact_json(strategy, max_list=6)
+        record_context("LogoGeneratorAgent.generate_concepts", str(strategy), brief)
+        out = run_step(
+            self.client,
+            "LogoGeneratorAgent.generate_concepts",
+            parse=parse_claude_response,
+            validate=lambda out: len([c for c in out.get("concepts") or [] if isinstance(c, str) and c.strip()]) >= count,
             max_tokens=2000,
-            messages=[{"role": "user", "content": f"Strategy: {strategy}\nGenerate {count} logo concept prompts for Flux. Return JSON: {{ \"concepts\": [\"...\", ...] }}"}],
+            messages=[{"role": "user", "content": f"Strategy: {brief}\nGenerate {count} logo concept prompts for Flux. Return JSON: {{ \"concepts\": [\"...\", ...] }}"}],
         )
-        out = parse_claude_response(r)
-        return (out.get("concepts") or [])[:count]
+        concepts = out.get("concepts") if isinstance(out.get("concepts"), list) else []
+        return [c.strip() for c in concepts if isinstance(c, str) and c.strip()][:count]
 
     def critique_and_rank(self, image_urls: list[str], brand_profile: dict[str, Any]) -> list[dict[str, Any]]:
-        r = self.client.messages.create(
-            model=CLAUDE_MODEL,
+        brand = compact_profile(brand_profile)
+        record_context("LogoGeneratorAgent.critique_and_rank", str(brand_profile), brand)
+        out = run_step(
+            self.client,
+            "LogoGeneratorAgent.critique_and_rank",
+            parse=parse_claude_response,
+            validate=lambda out: bool(out.get("rankings")),
             max_tokens=2000,
-            messages=[{"role": "user", "content": f"Brand: {brand_profile}. {len(image_urls)} logo URLs. Return JSON: rankings (array of rank, url_index, score, reason), usage_guidelines (array)."}],
+            messages=[{"role": "user", "content": f"Brand: {brand}. {len(image_urls)} logo URLs. Return JSON: rankings (array of rank, url_index, score, reason), usage_guidelines (array)."}],
         )
-        out = parse_claude_response(r)
-        rankings = out.get("rankings") or []
+        rankings = [x for x in out.get("rankings") or [] if isinstance(x, dict)]
         usage = out.get("usage_guidelines") or []
         return [{"rank": x.get("rank"), "url_index": x.get("url_index"), "score": x.get("score"), "reason": x.get("reason"), "usage_guidelines": usage} for x in rankings[:6]]
@@ -9,7 +9,14 @@ from fastapi.middleware.cors import CORSMiddleware
 load_dotenv(Path(__file__).resolve().parents[2] / ".env")
 load_dotenv(Path(__file__).resolve().parents[1] / ".env")
 
-app = FastAPI(title="Brand BLOOM+ API", version="0.1.0")
+# Imported after load_dotenv: these modules read their settings (PROFILE_ADMIN_TOKEN,
+# GZIP_MIN_SIZE, BRAND_DATA_DIR) at import time.
+from api.profiling import install_profiling  # noqa: E402
+from api.responses import FastJSONResponse, add_compression  # noqa: E402
+
+app = FastAPI(title="Brand BLOOM+ API", version="0.1.0", default_response_class=FastJSONResponse)
+install_profiling(app)
+add_compression(app)
 
 # Allow both local dev and production Vercel URL
 ALLOWED_ORIGINS = [
@@ -26,12 +33,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from api.routes import agentic, brands, generations, health, tools
+from api.routes import agentic, brands, generations, health, profiles, tools
 app.include_router(health.router)
 app.include_router(brands.router)
 app.include_router(generations.router)
 app.include_router(tools.router)
 app.include_router(agentic.router)
+app.include_router(profiles.router)
 
 @app.get("/")
 def root():
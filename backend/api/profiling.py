@@ -0,0 +1,100 @@
+"""On-demand request profiling, guarded by PROFILE_ADMIN_TOKEN.
+
+Send `X-Profile: inline` (or `?profile=inline`) with `X-Admin-Token` to get the profile embedded
+in a JSON response under `_profile`; any other value (`store`, `1`) stores it under
+BRAND_DATA_DIR/profiles/ and returns its id in the `X-Profile-Id` header for
+GET /api/profiles/{id}. Without a configured token the flag is ignored.
+
+The stack sampler watches the event-loop thread, so under concurrent traffic a profile also
+contains other in-flight requests' stacks, and work off the loop (asyncio.to_thread, sync routes
+in the threadpool, process pools) is not sampled; the stage timeline still covers its wall time.
+Reports carry this caveat under `sampling.scope`.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.responses import FastJSONResponse
+from services.profiling import SAMPLE_INTERVAL_MS, RequestProfile
+from services.storage import data_path, save_json
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", str(SAMPLE_INTERVAL_MS)))
+
+
+def is_admin(request: Request) -> bool:
+    token = request.headers.get("x-admin-token", "")
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(token.encode(), PROFILE_ADMIN_TOKEN.encode())
+
+
+def profile_path(profile_id: str):
+    return data_path(f"profiles/{profile_id}.json")
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: requests without the profile flag go straight to the app, untouched."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not PROFILE_ADMIN_TOKEN:
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        mode = (request.headers.get("x-profile") or request.query_params.get("profile") or "").lower()
+        if not mode:
+            await self.app(scope, receive, send)
+            return
+        if not is_admin(request):
+            await FastJSONResponse({"detail": "Profiling requires a valid X-Admin-Token"}, status_code=403)(scope, receive, send)
+            return
+
+        start: Message = {}
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        with RequestProfile(interval_ms=PROFILE_SAMPLE_INTERVAL_MS) as profile:
+            await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        status = start.get("status", 500)
+        response_headers = Headers(raw=start.get("headers", []))
+        report = {"method": request.method, "path": request.url.path, "status": status, **profile.report()}
+        headers = {k: v for k, v in response_headers.items() if k.lower() != "content-length"}
+        media_type = response_headers.get("content-type", "")
+
+        if mode == "inline" and "json" in media_type:
+            try:
+                content = json.loads(body) if body else {}
+            except ValueError:
+                content = None
+            if isinstance(content, dict):
+                content["_profile"] = report
+                await FastJSONResponse(content, status_code=status, headers=headers)(scope, receive, send)
+                return
+
+        profile_id = uuid.uuid4().hex
+        await asyncio.to_thread(save_json, profile_path(profile_id), report)
+        logger.info("Stored profile %s for %s %s (%.0f ms)", profile_id, request.method, request.url.path, report["wall_ms"])
+        headers["X-Profile-Id"] = profile_id
+        await Response(content=body, status_code=status, headers=headers)(scope, receive, send)
+
+
+def install_profiling(app: FastAPI) -> None:
+    """Register before compression middleware so the profiler sees uncompressed JSON bodies."""
+    app.add_middleware(ProfilingMiddleware)
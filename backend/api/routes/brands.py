@@ -1,25 +1,29 @@
 """Brand routes: analyze website URL and return brand profile (trybloom.ai-style extraction)."""
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from agents.brand_analyzer import BrandAnalyzer
+from agents.brand_analyzer import CRAWL_MAX_PAGES, BrandAnalyzer
+from api.schemas import BrandProfile
 
 router = APIRouter(prefix="/api/brands", tags=["brands"])
 
 
 class AnalyzeRequest(BaseModel):
     url: str
+    crawl: bool = False
+    max_pages: int = Field(default=CRAWL_MAX_PAGES, ge=1, le=20)
 
 
-@router.post("/analyze")
+@router.post("/analyze", response_model=BrandProfile)
 async def analyze_brand(body: AnalyzeRequest):
-    """Extract brand identity (colors, fonts, logo, style) from website URL. Agentic: BrandAnalyzer uses Claude + CSS/HTML parsing."""
+    """Extract brand identity (colors, fonts, logo, style) from website URL. Agentic: BrandAnalyzer uses Claude + CSS/HTML parsing.
+    Set crawl=true to also analyze key pages (about, pricing, product...) found in the nav or sitemap."""
     url = (body.url or "").strip()
     if not url or not url.startswith("http"):
         raise HTTPException(status_code=400, detail="Valid URL required (e.g. https://example.com)")
     try:
         analyzer = BrandAnalyzer()
-        profile = await analyzer.analyze_website(url)
+        profile = await analyzer.analyze_website(url, crawl=body.crawl, max_pages=body.max_pages)
         return profile
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
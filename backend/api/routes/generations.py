@@ -1,12 +1,16 @@
 """Generation routes: logo, assets, design system (trybloom.ai-style)."""
-from typing import Any
+import json
+from typing import Any, Iterator
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from workflows.logo_generation import run_logo_generation
 from workflows.asset_creation import run_asset_creation
+from agents.asset_creator import AssetCreatorAgent
 from agents.design_system import DesignSystemAgent
+from api.schemas import AssetResponse, DesignSystemResponse, LogoGenerationResponse
 
 router = APIRouter(prefix="/api/generations", tags=["generations"])
 
@@ -18,7 +22,17 @@ class AssetRequest(BaseModel):
     copy_text: str | None = None
 
 
-@router.post("/logo")
+class AssetVariantsRequest(BaseModel):
+    brand_profile: dict[str, Any]
+    asset_types: list[str] = ["social"]
+    dimensions: list[str] = ["1080x1080"]
+    copy_texts: list[str | None] = [None]
+
+
+MAX_VARIANTS = 200
+
+
+@router.post("/logo", response_model=LogoGenerationResponse)
 async def generate_logo(brand_profile: dict[str, Any]):
     """Run agentic logo generation: strategy → concepts → (image gen) → critique & rank."""
     try:
@@ -28,7 +42,7 @@ async def generate_logo(brand_profile: dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/asset")
+@router.post("/asset", response_model=AssetResponse)
 async def create_asset(body: AssetRequest):
     """Generate on-brand asset prompt from profile + optional copy/dimensions."""
     try:
@@ -43,12 +57,35 @@ async def create_asset(body: AssetRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/design-system")
-async def create_design_system(brand_profile: dict[str, Any]):
-    """Generate design system style guide from brand profile."""
+@router.post("/asset-variants")
+async def create_asset_variants(body: AssetVariantsRequest):
+    """Prompts for every asset_type x dimensions x copy_text combination, streamed as NDJSON (one variant per line)."""
+    total = len(set(body.asset_types)) * len(set(body.dimensions)) * len(set(body.copy_texts))
+    if not total:
+        raise HTTPException(status_code=400, detail="asset_types, dimensions and copy_texts must be non-empty")
+    if total > MAX_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_VARIANTS} variants per request (got {total})")
+    try:
+        agent = AssetCreatorAgent()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def lines() -> Iterator[str]:
+        try:
+            for variant in agent.iter_prompt_variants(body.brand_profile, body.asset_types, body.dimensions, body.copy_texts):
+                yield json.dumps(variant) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/design-system", response_model=DesignSystemResponse)
+async def create_design_system(brand_profile: dict[str, Any], guidance: bool = False):
+    """Generate design system style guide from brand profile (computed locally; ?guidance=true adds Claude prose)."""
     try:
         agent = DesignSystemAgent()
-        style_guide = agent.generate_style_guide(brand_profile)
+        style_guide = agent.generate_style_guide(brand_profile, include_guidance=guidance)
         tokens = agent.export_tokens(style_guide)
         return {"style_guide": style_guide, "tokens": tokens}
     except Exception as e:
@@ -1,8 +1,18 @@
 from fastapi import APIRouter
 
+from services import metrics
+from services.model_router import MODEL_TIERS, STEP_ROUTES
+from services.prompt_context import context_report
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 def health():
     return {"ok": True}
+
+
+@router.get("/health/agents")
+def agent_metrics():
+    """Per agent method latency/cost/escalation counters since process start, the model routing table and prompt-context token reduction."""
+    return {"steps": metrics.snapshot(), "routes": STEP_ROUTES, "tiers": MODEL_TIERS, "context": context_report()}
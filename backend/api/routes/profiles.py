@@ -0,0 +1,24 @@
+"""Stored request profiles (see api/profiling.py); admin token required."""
+import re
+
+from fastapi import APIRouter, HTTPException, Request
+
+from api.profiling import is_admin, profile_path
+from services.storage import load_json
+
+router = APIRouter(prefix="/api/profiles", tags=["profiles"])
+
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    """Download a profile captured with X-Profile: store."""
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Valid X-Admin-Token required")
+    if not PROFILE_ID_RE.match(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    report = load_json(profile_path(profile_id), None)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
@@ -1,15 +1,62 @@
 """Tools: upload transform, quality critique, research, resizer (trybloom.ai-style)."""
+import asyncio
+import logging
+import re
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from agents.asset_creator import AssetCreatorAgent
+from services.brand_index import get_brand_index
+from services.stylesheet_index import site_domain
+from services.upload_ingest import PYRAMID_SIZES, UploadRejected, describe_upload, spool_upload, upload_dir
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tools", tags=["tools"])
 
+UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
 
 @router.post("/upload-transform")
-async def upload_transform(body: dict[str, Any]):
-    # Stub: would call UploadTransformerAgent
-    return {"message": "Upload transform placeholder", "prompt": None}
+async def upload_transform(request: Request, brand_url: str | None = None, asset_type: str = "social"):
+    """Upload a photo as the raw request body (Content-Type image/jpeg, image/png or image/webp).
+
+    The body is streamed to disk with size/type limits enforced as it arrives, decoded once in a
+    worker process into a thumbnail pyramid and a palette measured against the brand's colors.
+    With ?brand_url= of an analyzed brand, also returns an on-brand img2img prompt (404 if the
+    brand has not been analyzed). Thumbnails are kept for UPLOAD_TTL_HOURS; the original is not kept.
+    """
+    profile = get_brand_index().get(brand_url) if brand_url else None
+    if brand_url and profile is None:
+        raise HTTPException(status_code=404, detail="Brand not analyzed yet; analyze it first")
+    try:
+        upload = await spool_upload(
+            request.stream(), request.headers.get("content-type", ""), request.headers.get("content-length")
+        )
+        brand_colors = list((profile or {}).get("primary_colors") or []) + list((profile or {}).get("secondary_colors") or [])
+        descriptor = await describe_upload(upload, brand_colors)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    prompt = None
+    if profile:
+        try:
+            prompt = await asyncio.to_thread(AssetCreatorAgent().generate_transform_prompt, profile, descriptor, asset_type)
+        except Exception as e:
+            logger.exception("Transform prompt failed for %s", upload["upload_id"])
+            raise HTTPException(status_code=500, detail=str(e))
+    return {"upload_id": upload["upload_id"], "descriptor": descriptor, "prompt": prompt}
+
+
+@router.get("/uploads/{upload_id}/{size}.jpg")
+async def upload_thumbnail(upload_id: str, size: int):
+    """A pyramid level of an ingested upload."""
+    path = upload_dir(upload_id) / f"{size}.jpg"
+    if not UPLOAD_ID_RE.match(upload_id) or size not in PYRAMID_SIZES or not path.is_file():
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return FileResponse(path, media_type="image/jpeg")
 
 
 @router.post("/quality/critique")
@@ -18,10 +65,49 @@ async def quality_critique(body: dict[str, Any]):
     return {"score": 0, "feedback": []}
 
 
+def _competitor_suggestions(profile: dict[str, Any], competitors: list[dict[str, Any]]) -> list[str]:
+    suggestions = []
+    fonts = {str(f).lower() for f in profile.get("fonts") or []}
+    for c in competitors[:3]:
+        name = c.get("domain") or c.get("url")
+        if c["similarity"] >= 0.6:
+            suggestions.append(f"Palette is very close to {name}; a distinct accent color would help you stand apart.")
+        # Match case-insensitively, but print the font names as the competitor stores them.
+        shared = [str(f) for f in c.get("fonts") or [] if str(f).lower() in fonts]
+        if shared:
+            suggestions.append(f"{name} also uses {', '.join(dict.fromkeys(shared))}.")
+    return suggestions
+
+
+def _public_competitor(entry: dict[str, Any]) -> dict[str, Any]:
+    """Index entry without internal fields (palette_lab vectors, domain key)."""
+    return {k: v for k, v in entry.items() if k not in ("palette_lab", "domain")}
+
+
 @router.post("/research/competitors")
 async def research_competitors(body: dict[str, Any]):
-    # Stub: would call ResearchAgent
-    return {"competitors": [], "suggestions": []}
+    """Brands that look like yours: nearest neighbors in the local brand index (no LLM call).
+
+    Body: {"url": "..."} for an analyzed brand, or {"brand_profile": {...}}; optional "limit" (default 5).
+    """
+    index = get_brand_index()
+    url = str(body.get("url") or "").strip()
+    profile = body.get("brand_profile") or (index.get(url) if url else None)
+    if not isinstance(profile, dict):
+        if url:
+            raise HTTPException(status_code=404, detail="Brand not analyzed yet; analyze it first or send brand_profile")
+        raise HTTPException(status_code=400, detail="url or brand_profile required")
+    try:
+        limit = max(1, min(int(body.get("limit") or 5), 50))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="limit must be an integer")
+    domain = site_domain(url or profile.get("url") or "") or None
+    competitors = index.nearest(profile, k=limit, exclude_domain=domain)
+    return {
+        "competitors": [_public_competitor(c) for c in competitors],
+        "suggestions": _competitor_suggestions(profile, competitors),
+        "indexed_brands": len(index),
+    }
 
 
 @router.get("/resizer/platforms")
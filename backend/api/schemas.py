@@ -0,0 +1,40 @@
+"""Typed response models: FastAPI serializes these with pydantic-core instead of jsonable_encoder.
+
+Types describe what the agents guarantee after post-processing; fields passed through from model
+output unchecked (style, mood, strategy...) stay `Any` so an unexpected shape is still returned
+rather than failing response validation after the LLM calls were paid for.
+"""
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class BrandProfile(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    url: str | None = None
+    primary_colors: list[str] = []
+    secondary_colors: list[str] = []
+    fonts: list[str] = []
+    style: Any = None
+    mood: Any = None
+    logo_description: Any = None
+    logo_url: str | None = None
+    logo_colors: list[str] = []
+
+
+class LogoGenerationResponse(BaseModel):
+    strategy: dict[str, Any] = {}
+    concepts: list[str] = []
+    image_urls: list[str] = []
+    rankings: list[dict[str, Any]] = []
+
+
+class AssetResponse(BaseModel):
+    prompt: str
+    suggested_formats: list[dict[str, Any]] = []
+
+
+class DesignSystemResponse(BaseModel):
+    style_guide: dict[str, Any]
+    tokens: dict[str, Any]
@@ -0,0 +1,110 @@
+"""Response encoding benchmark: default FastAPI path vs typed models + orjson, per endpoint.
+
+Run from backend/: python -m benchmarks.bench_responses
+"""
+import base64
+import gzip
+import json
+import os
+import time
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from api.responses import FastJSONResponse, gzip_level
+from api.schemas import BrandProfile, DesignSystemResponse
+from services.design_tokens import build_style_guide, to_css_variables, to_style_dictionary, to_tailwind_config
+
+PROFILE: dict[str, Any] = {
+    "url": "https://example.com",
+    "primary_colors": ["#635bff", "#0a2540"],
+    "secondary_colors": ["#00d4ff", "#f6f9fc", "#425466"],
+    "fonts": ["Sohne", "Inter", "Source Code Pro"],
+    "style": "Clean, technical and confident with generous whitespace and bold gradients.",
+    "mood": ["confident", "modern", "trustworthy", "precise"],
+    "logo_description": "Lowercase wordmark in a custom geometric sans.",
+    "logo_url": "https://example.com/logo.svg",
+    "logo_colors": ["#635bff"],
+}
+
+
+class GenerateResponse(BaseModel):
+    success: bool
+    image_url: str | None = None
+    error: str | None = None
+
+
+def _design_system() -> dict[str, Any]:
+    guide = build_style_guide(PROFILE)
+    tokens = {
+        "colors": guide["colors"],
+        "typography": guide["typography"],
+        "css": to_css_variables(guide),
+        "tailwind": to_tailwind_config(guide),
+        "style_dictionary": to_style_dictionary(guide),
+    }
+    return {"style_guide": guide, "tokens": tokens}
+
+
+def _generate_image() -> dict[str, Any]:
+    data = base64.b64encode(os.urandom(1_500_000)).decode()
+    return {"success": True, "image_url": f"data:image/png;base64,{data}", "error": None}
+
+
+ENDPOINTS: list[tuple[str, Callable[[], dict[str, Any]], type[BaseModel]]] = [
+    ("POST /api/brands/analyze", lambda: PROFILE, BrandProfile),
+    ("POST /api/generations/design-system", _design_system, DesignSystemResponse),
+    ("POST /api/generate-image (server.py)", _generate_image, GenerateResponse),
+]
+
+
+def _stdlib(content: Any) -> bytes:
+    # What FastAPI did before: jsonable_encoder, then JSONResponse.render.
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _fast(model: type[BaseModel]) -> Callable[[Any], bytes]:
+    adapter = TypeAdapter(model)
+
+    def encode(content: Any) -> bytes:
+        # What FastAPI does now: validate into the response model, dump with pydantic-core, render with orjson.
+        return FastJSONResponse(adapter.dump_python(adapter.validate_python(content), mode="json")).body
+
+    return encode
+
+
+def _time(fn: Callable[[Any], bytes], payload: Any, rounds: int) -> tuple[float, bytes]:
+    body = fn(payload)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(payload)
+    return (time.perf_counter() - t0) * 1000 / rounds, body
+
+
+def _gzip(body: bytes, level: int | None, rounds: int) -> tuple[float, int]:
+    if level is None:
+        return 0.0, len(body)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        out = gzip.compress(body, compresslevel=level, mtime=0)
+    return (time.perf_counter() - t0) * 1000 / rounds, len(out)
+
+
+def main() -> None:
+    # "gzip" columns follow the middleware policy (api.responses.gzip_level); "-" means sent uncompressed.
+    print(f"{'endpoint':<40} {'path':<8} {'encode ms':>10} {'bytes':>10} {'gzip ms':>8} {'gzip bytes':>11} {'always-gzip ms':>15}")
+    for name, build, model in ENDPOINTS:
+        payload = build()
+        rounds = 20 if "image" in name else 2000
+        for label, fn in (("default", _stdlib), ("fast", _fast(model))):
+            ms, body = _time(fn, payload, rounds)
+            level = gzip_level("application/json", body)
+            gz_ms, gz_bytes = _gzip(body, level, rounds)
+            forced_ms, _ = _gzip(body, 6, rounds)
+            shown = f"{gz_ms:>8.4f}" if level is not None else f"{'-':>8}"
+            print(f"{name:<40} {label:<8} {ms:>10.4f} {len(body):>10} {shown} {gz_bytes:>11} {forced_ms:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
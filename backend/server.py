@@ -14,7 +14,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="BrandBloom Image Generator")
+# After load_dotenv: api.responses reads GZIP_MIN_SIZE at import time.
+from api.responses import FastJSONResponse, add_compression  # noqa: E402
+
+app = FastAPI(title="BrandBloom Image Generator", default_response_class=FastJSONResponse)
+add_compression(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,10 +26,13 @@ def _normalize_keys(obj: Any) -> Any:
         return [_normalize_keys(i) for i in obj]
     return obj
 
+def response_text(response: Any) -> str:
+    return "".join(getattr(b, "text", "") for b in (response.content or [])).strip()
+
 def parse_claude_response(response: Any) -> dict[str, Any]:
     if not response.content:
         return {}
-    text = "".join(getattr(b, "text", "") for b in response.content)
+    text = response_text(response)
     if not text.strip():
         return {}
     m = re.search(r"```(?:json)?\s*(\{[\s\S]*?\})\s*```", text)
@@ -0,0 +1,161 @@
+"""Persistent similarity index over analyzed brands: palette as Lab vectors plus hashed font/mood features.
+
+Rows live in a NumPy matrix with amortized-doubling growth, so inserts are O(1) and a query is one
+vectorized brute-force distance pass (a few milliseconds at 20k brands, no tree to rebalance).
+Entries are persisted as an append-only JSONL log keyed by domain.
+"""
+import hashlib
+import logging
+import threading
+from typing import Any
+
+import numpy as np
+
+from services.color import hex_to_lab
+from services.storage import append_jsonl, data_path, load_jsonl, rewrite_jsonl
+from services.stylesheet_index import site_domain
+
+logger = logging.getLogger(__name__)
+
+MAX_PALETTE = 6
+HASH_DIMS = 16
+# Soft Lab histogram: palette colors spread over a coarse grid of bin centers, so palettes of any
+# length and order compare directly.
+LAB_BINS = np.array([(L, a, b) for L in (15.0, 50.0, 85.0) for a in (-60.0, 0.0, 60.0) for b in (-60.0, 0.0, 60.0)])
+LAB_SIGMA = 35.0
+LAB_SCALE = np.array([100.0, 128.0, 128.0])
+FEATURE_DIMS = 3 + len(LAB_BINS) + 2 * HASH_DIMS
+FONT_SLICE = slice(3 + len(LAB_BINS), 3 + len(LAB_BINS) + HASH_DIMS)
+MOOD_SLICE = slice(3 + len(LAB_BINS) + HASH_DIMS, FEATURE_DIMS)
+# Relative weight of each feature group in the distance.
+PRIMARY_WEIGHT, PALETTE_WEIGHT, FONT_WEIGHT, MOOD_WEIGHT = 1.0, 1.0, 0.4, 0.3
+ENTRY_FIELDS = ("url", "primary_colors", "secondary_colors", "fonts", "mood", "style")
+
+
+def _hashed_bag(words: list[str]) -> np.ndarray:
+    vec = np.zeros(HASH_DIMS)
+    for w in words:
+        w = str(w).strip().lower()
+        if w:
+            vec[int(hashlib.md5(w.encode()).hexdigest()[:8], 16) % HASH_DIMS] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _as_list(val: Any) -> list[str]:
+    if isinstance(val, str):
+        return [v for v in val.replace(";", ",").split(",") if v.strip()]
+    return [str(v) for v in val] if isinstance(val, list) else []
+
+
+def palette_lab(profile: dict[str, Any]) -> list[tuple[float, float, float]]:
+    colors = _as_list(profile.get("primary_colors")) + _as_list(profile.get("secondary_colors"))
+    return [lab for lab in (hex_to_lab(c) for c in colors[:MAX_PALETTE]) if lab]
+
+
+def profile_features(profile: dict[str, Any], stored: bool = False) -> np.ndarray | None:
+    """Feature vector for a brand profile, or None when it has no usable colors:
+    main primary color (Lab), soft Lab histogram of the whole palette, hashed fonts and mood.
+
+    Only index entries (stored=True) use their precomputed palette_lab; query profiles come from
+    clients, so their palette is always recomputed from the hex colors.
+    """
+    palette = np.asarray((profile.get("palette_lab") if stored else None) or palette_lab(profile), dtype=float)
+    if not len(palette):
+        return None
+    primary = palette[0] / LAB_SCALE * PRIMARY_WEIGHT
+    hist = np.exp(-((palette[:, None, :] - LAB_BINS[None, :, :]) ** 2).sum(-1) / (2 * LAB_SIGMA**2)).sum(0)
+    hist = hist / (np.linalg.norm(hist) or 1.0) * PALETTE_WEIGHT
+    fonts = _hashed_bag(_as_list(profile.get("fonts"))[:4]) * FONT_WEIGHT
+    mood = _hashed_bag(_as_list(profile.get("mood"))[:6]) * MOOD_WEIGHT
+    return np.concatenate([primary, hist, fonts, mood])
+
+
+class BrandIndex:
+    def __init__(self, path: Any = None) -> None:
+        self.path = path or data_path("brand_index.jsonl")
+        self._lock = threading.Lock()
+        self._entries: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._matrix = np.zeros((64, FEATURE_DIMS))
+        logged = load_jsonl(self.path)
+        for row in logged:
+            self._upsert(row)
+        if len(logged) > 2 * len(self._entries) + 100:
+            rewrite_jsonl(self.path, self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _upsert(self, entry: dict[str, Any]) -> bool:
+        vec = profile_features(entry, stored=True)
+        key = entry.get("domain")
+        if vec is None or not key:
+            return False
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._entries)
+            if row >= len(self._matrix):
+                self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+            self._rows[key] = row
+            self._entries.append(entry)
+        else:
+            self._entries[row] = entry
+        self._matrix[row] = vec
+        return True
+
+    def add(self, profile: dict[str, Any]) -> bool:
+        """Insert or replace the brand for this profile's domain; returns False if it has no colors."""
+        entry = {k: profile.get(k) for k in ENTRY_FIELDS if profile.get(k)}
+        entry["domain"] = site_domain(profile.get("url") or "")
+        entry["palette_lab"] = [[round(v, 2) for v in lab] for lab in palette_lab(profile)]
+        with self._lock:
+            if not self._upsert(entry):
+                return False
+            append_jsonl(self.path, entry)
+        return True
+
+    def get(self, url_or_domain: str) -> dict[str, Any] | None:
+        key = site_domain(url_or_domain) if "://" in url_or_domain else url_or_domain.lower().removeprefix("www.")
+        row = self._rows.get(key)
+        return self._entries[row] if row is not None else None
+
+    def nearest(self, profile: dict[str, Any], k: int = 5, exclude_domain: str | None = None) -> list[dict[str, Any]]:
+        """k most similar indexed brands, closest first, with distance and a 0-1 similarity."""
+        vec = profile_features(profile)
+        if vec is None:
+            return []
+        # Compare only on what the query has: a palette-only query should not be pulled toward font-less brands.
+        mask = np.ones(FEATURE_DIMS)
+        for block in (FONT_SLICE, MOOD_SLICE):
+            if not vec[block].any():
+                mask[block] = 0.0
+        with self._lock:
+            n = len(self._entries)
+            if not n:
+                return []
+            dists = np.sqrt((((self._matrix[:n] - vec) * mask) ** 2).sum(axis=1))
+            skip = self._rows.get(exclude_domain) if exclude_domain else None
+            if skip is not None:
+                dists[skip] = np.inf
+            k = min(k, n - (skip is not None))
+            if k <= 0:
+                return []
+            idx = np.argpartition(dists, k - 1)[:k]
+            idx = idx[np.argsort(dists[idx])]
+            return [
+                {**self._entries[i], "distance": round(float(dists[i]), 4), "similarity": round(float(np.exp(-dists[i])), 4)}
+                for i in idx
+            ]
+
+
+_index: BrandIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_brand_index() -> BrandIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BrandIndex()
+    return _index
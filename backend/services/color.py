@@ -0,0 +1,81 @@
+"""Color helpers shared by the analyzers and generators (hex <-> RGB, distance, palette merging)."""
+import math
+
+HEX_DIGITS = set("0123456789abcdefABCDEF")
+
+
+def hex_to_rgb(c: str) -> tuple[int, int, int] | None:
+    c = (c or "").strip().lstrip("#")
+    if len(c) == 3:
+        c = "".join(ch * 2 for ch in c)
+    if len(c) != 6 or not set(c) <= HEX_DIGITS:
+        return None
+    return int(c[0:2], 16), int(c[2:4], 16), int(c[4:6], 16)
+
+
+def rgb_to_hex(r: float, g: float, b: float) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*(max(0, min(255, int(round(v)))) for v in (r, g, b)))
+
+
+def normalize_hex(c: str) -> str | None:
+    rgb = hex_to_rgb(c)
+    return rgb_to_hex(*rgb) if rgb else None
+
+
+def color_distance(a: str, b: str) -> float:
+    """Redmean-weighted RGB distance: cheap and close enough to perceptual for dedup."""
+    ra, rb = hex_to_rgb(a), hex_to_rgb(b)
+    if not ra or not rb:
+        return math.inf
+    rmean = (ra[0] + rb[0]) / 2
+    dr, dg, db = ra[0] - rb[0], ra[1] - rb[1], ra[2] - rb[2]
+    return math.sqrt((2 + rmean / 256) * dr * dr + 4 * dg * dg + (2 + (255 - rmean) / 256) * db * db)
+
+
+def merge_palettes(*palettes: list[str], limit: int = 12, min_distance: float = 30.0) -> list[str]:
+    """Merge ranked palettes in priority order, dropping colors too close to one already kept."""
+    merged: list[str] = []
+    for palette in palettes:
+        for c in palette:
+            norm = normalize_hex(c)
+            if not norm or any(color_distance(norm, m) < min_distance for m in merged):
+                continue
+            merged.append(norm)
+            if len(merged) >= limit:
+                return merged
+    return merged
+
+
+def mix(a: str, b: str, weight: float) -> str:
+    """Blend color a toward b; weight 0 returns a, 1 returns b."""
+    ra, rb = hex_to_rgb(a), hex_to_rgb(b)
+    if not ra or not rb:
+        return a
+    return rgb_to_hex(*(x + (y - x) * weight for x, y in zip(ra, rb)))
+
+
+def relative_luminance(c: str) -> float:
+    """WCAG 2.x relative luminance (0 = black, 1 = white)."""
+    rgb = hex_to_rgb(c) or (0, 0, 0)
+    channels = [v / 255 for v in rgb]
+    r, g, b = (v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4 for v in channels)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(a: str, b: str) -> float:
+    la, lb = relative_luminance(a), relative_luminance(b)
+    hi, lo = max(la, lb), min(la, lb)
+    return (hi + 0.05) / (lo + 0.05)
+
+
+def hex_to_lab(c: str) -> tuple[float, float, float] | None:
+    """CIE L*a*b* (D65) for perceptual distances; L in 0-100, a/b roughly -128..127."""
+    rgb = hex_to_rgb(c)
+    if not rgb:
+        return None
+    r, g, b = (v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4 for v in (x / 255 for x in rgb))
+    x = (0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047
+    y = 0.2126 * r + 0.7152 * g + 0.0722 * b
+    z = (0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883
+    fx, fy, fz = (t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116 for t in (x, y, z))
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
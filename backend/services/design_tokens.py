@@ -0,0 +1,168 @@
+"""Deterministic design-system engine: color ramps, type/spacing scales, WCAG pairs, logo rules, token exporters."""
+import json
+from typing import Any
+
+from services.color import contrast_ratio, mix, normalize_hex
+
+WHITE, INK = "#ffffff", "#111111"
+# Ramp step -> (blend target, weight). 500 is the brand color itself.
+RAMP_STEPS: dict[str, tuple[str, float]] = {
+    "50": (WHITE, 0.92), "100": (WHITE, 0.84), "200": (WHITE, 0.68), "300": (WHITE, 0.48), "400": (WHITE, 0.24),
+    "500": (WHITE, 0.0),
+    "600": ("#000000", 0.14), "700": ("#000000", 0.30), "800": ("#000000", 0.46), "900": ("#000000", 0.62),
+}
+TYPE_STEPS = ("xs", "sm", "base", "lg", "xl", "2xl", "3xl", "4xl", "5xl")
+SPACING_STEPS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 20, 24)
+GENERIC_FONTS = {"sans-serif", "serif", "monospace", "system-ui"}
+DEFAULT_PRIMARY = "#2563eb"
+AA_NORMAL, AA_LARGE, AAA_NORMAL = 4.5, 3.0, 7.0
+
+
+def color_ramp(base: str) -> dict[str, str]:
+    return {step: mix(base, target, weight) for step, (target, weight) in RAMP_STEPS.items()}
+
+
+def type_scale(base_px: float = 16.0, ratio: float = 1.25) -> dict[str, dict[str, Any]]:
+    """Modular scale: each step is ratio x the previous one, anchored at `base`."""
+    anchor = TYPE_STEPS.index("base")
+    scale = {}
+    for i, name in enumerate(TYPE_STEPS):
+        px = round(base_px * ratio ** (i - anchor), 2)
+        scale[name] = {"px": px, "rem": round(px / 16, 4), "line_height": 1.5 if px <= 20 else 1.25 if px <= 36 else 1.1}
+    return scale
+
+
+def spacing_scale(unit_px: int = 4) -> dict[str, str]:
+    return {str(step): f"{step * unit_px}px" for step in SPACING_STEPS}
+
+
+def _as_list(val: Any) -> list[str]:
+    """String items of a list, or the parts of a comma/semicolon-separated string ("#ff0000, #00ff00")."""
+    if isinstance(val, str):
+        return [v.strip() for v in val.replace(";", ",").split(",") if v.strip()]
+    return [v.strip() for v in val if isinstance(v, str) and v.strip()] if isinstance(val, list) else []
+
+
+def _hexes(val: Any) -> list[str]:
+    return [h for h in (normalize_hex(c) for c in _as_list(val)) if h]
+
+
+def _fonts(val: Any) -> list[str]:
+    """Font names from a list or a comma-separated string ("Inter, Georgia")."""
+    return [f for f in (v.strip("'\"") for v in _as_list(val)) if f and f.lower() not in GENERIC_FONTS]
+
+
+def _font_stack(font: str | None, fallback: str) -> str:
+    if not font:
+        return fallback
+    return f'"{font}", {fallback}' if " " in font else f"{font}, {fallback}"
+
+
+def contrast_pairs(colors: dict[str, str]) -> list[dict[str, Any]]:
+    """Best text color for each brand background, with its WCAG 2.x contrast grade."""
+    pairs = []
+    for name, background in colors.items():
+        candidates = [WHITE, INK, mix(background, "#000000", 0.7), mix(background, WHITE, 0.9)]
+        text = max(candidates, key=lambda t: contrast_ratio(background, t))
+        ratio = round(contrast_ratio(background, text), 2)
+        pairs.append({
+            "name": name,
+            "background": background,
+            "text": text,
+            "ratio": ratio,
+            "aa": ratio >= AA_NORMAL,
+            "aa_large": ratio >= AA_LARGE,
+            "aaa": ratio >= AAA_NORMAL,
+        })
+    return pairs
+
+
+def logo_usage_rules(min_size_px: int = 24) -> dict[str, Any]:
+    return {
+        "clear_space": "Keep clear space on every side equal to 25% of the logo height; never less than 8px.",
+        "clear_space_ratio": 0.25,
+        "min_size": {"digital_px": min_size_px, "print_mm": 12},
+        "donots": [
+            "Do not stretch, skew or rotate the logo.",
+            "Do not recolor the logo outside the brand palette.",
+            "Do not place the logo on backgrounds below 3:1 contrast.",
+            "Do not add shadows, outlines or effects.",
+        ],
+    }
+
+
+def build_style_guide(brand_profile: dict[str, Any]) -> dict[str, Any]:
+    """Full style guide computed from the profile's hex colors and fonts; no model call."""
+    primary = _hexes(brand_profile.get("primary_colors"))[:3] or [DEFAULT_PRIMARY]
+    secondary = _hexes(brand_profile.get("secondary_colors"))[:3]
+    fonts = _fonts(brand_profile.get("fonts"))
+    heading_font = fonts[0] if fonts else None
+    body_font = fonts[1] if len(fonts) > 1 else heading_font
+
+    named = {"primary": primary[0]}
+    named.update({f"primary-{i + 1}": c for i, c in enumerate(primary[1:])})
+    named.update({("secondary" if i == 0 else f"secondary-{i}"): c for i, c in enumerate(secondary)})
+    named["neutral"] = mix(primary[0], "#808080", 0.85)
+    scale = type_scale()
+    return {
+        "colors": {
+            "primary": primary,
+            "secondary": secondary,
+            "ramps": {name: color_ramp(c) for name, c in named.items()},
+        },
+        "typography": {
+            "headings": {"family": heading_font, "stack": _font_stack(heading_font, "system-ui, sans-serif"), "weight": 700},
+            "body": {"family": body_font, "stack": _font_stack(body_font, "system-ui, sans-serif"), "weight": 400},
+            "scale": scale,
+            "ratio": 1.25,
+        },
+        "spacing": spacing_scale(),
+        "contrast_pairs": contrast_pairs(named),
+        "logo_usage": logo_usage_rules(),
+    }
+
+
+def to_css_variables(style_guide: dict[str, Any]) -> str:
+    lines = [":root {"]
+    for name, ramp in (style_guide.get("colors") or {}).get("ramps", {}).items():
+        lines.extend(f"  --color-{name}-{step}: {value};" for step, value in ramp.items())
+        lines.append(f"  --color-{name}: {ramp.get('500')};")
+    typography = style_guide.get("typography") or {}
+    for role in ("headings", "body"):
+        if typography.get(role):
+            lines.append(f"  --font-{role}: {typography[role]['stack']};")
+    for step, size in (typography.get("scale") or {}).items():
+        lines.append(f"  --text-{step}: {size['rem']}rem;")
+    for step, value in (style_guide.get("spacing") or {}).items():
+        lines.append(f"  --space-{step}: {value};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def to_tailwind_config(style_guide: dict[str, Any]) -> str:
+    typography = style_guide.get("typography") or {}
+    extend = {
+        "colors": (style_guide.get("colors") or {}).get("ramps", {}),
+        "fontFamily": {
+            ("heading" if role == "headings" else "body"): [s.strip().strip('"') for s in typography[role]["stack"].split(",")]
+            for role in ("headings", "body") if typography.get(role)
+        },
+        "fontSize": {step: [f"{size['rem']}rem", {"lineHeight": str(size["line_height"])}] for step, size in (typography.get("scale") or {}).items()},
+        "spacing": style_guide.get("spacing") or {},
+    }
+    return "/** @type {import('tailwindcss').Config} */\nmodule.exports = " + json.dumps({"theme": {"extend": extend}}, indent=2) + ";\n"
+
+
+def to_style_dictionary(style_guide: dict[str, Any]) -> dict[str, Any]:
+    typography = style_guide.get("typography") or {}
+    return {
+        "color": {
+            name: {step: {"value": value} for step, value in ramp.items()}
+            for name, ramp in (style_guide.get("colors") or {}).get("ramps", {}).items()
+        },
+        "font": {
+            "family": {role: {"value": typography[role]["stack"]} for role in ("headings", "body") if typography.get(role)},
+            "size": {step: {"value": f"{size['rem']}rem"} for step, size in (typography.get("scale") or {}).items()},
+        },
+        "size": {"spacing": {step: {"value": value} for step, value in (style_guide.get("spacing") or {}).items()}},
+    }
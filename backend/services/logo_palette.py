@@ -0,0 +1,157 @@
+"""Dominant colors of a logo image: SVG paint parsing or vectorized k-means on a downsampled raster."""
+import logging
+import re
+from collections import Counter
+from io import BytesIO
+
+from services.color import merge_palettes, normalize_hex, rgb_to_hex
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGO_BYTES = 5_000_000
+SAMPLE_SIZE = 128
+SVG_PAINT_RE = re.compile(
+    r"(?:fill|stroke|stop-color)\s*[=:]\s*[\"']?\s*(#[0-9a-fA-F]{6}\b|#[0-9a-fA-F]{3}\b|rgba?\(\s*\d+\s*,\s*\d+\s*,\s*\d+[^)]*\))",
+    re.IGNORECASE,
+)
+RGB_FUNC_RE = re.compile(r"rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)", re.IGNORECASE)
+
+
+def is_svg(data: bytes, content_type: str = "") -> bool:
+    if "svg" in content_type.lower():
+        return True
+    head = data[:1024].lstrip().lower()
+    return head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head)
+
+
+def _svg_palette(svg_text: str, max_colors: int) -> list[str]:
+    counts: Counter[str] = Counter()
+    for m in SVG_PAINT_RE.finditer(svg_text):
+        paint = m.group(1)
+        rgb_m = RGB_FUNC_RE.match(paint)
+        color = rgb_to_hex(*(int(v) for v in rgb_m.groups())) if rgb_m else normalize_hex(paint)
+        if color:
+            counts[color] += 1
+    return merge_palettes([c for c, _ in counts.most_common()], limit=max_colors)
+
+
+def _kmeans(pixels, k: int, iterations: int = 12):
+    """Plain Lloyd's k-means over an (n, 3) float array; k-means++ seeding with a fixed RNG for stable output."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    centers = [pixels[rng.integers(len(pixels))]]
+    for _ in range(1, k):
+        d2 = ((pixels[:, None, :] - np.asarray(centers)[None, :, :]) ** 2).sum(-1).min(1)
+        total = d2.sum()
+        if total <= 0:
+            break
+        centers.append(pixels[rng.choice(len(pixels), p=d2 / total)])
+    centers = np.asarray(centers)
+    for _ in range(iterations):
+        labels = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(-1).argmin(1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, pixels)
+        moved = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.allclose(moved, centers, atol=0.5):
+            centers = moved
+            break
+        centers = moved
+    labels = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(-1).argmin(1)
+    return centers, np.bincount(labels, minlength=len(centers))
+
+
+def _border_background(rgb):
+    """Most common (coarsely quantized) color along the image border, as a float RGB triple."""
+    import numpy as np
+
+    border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]])
+    _, inverse, counts = np.unique((border // 16).astype(np.int32), axis=0, return_inverse=True, return_counts=True)
+    top = counts.argmax()
+    if counts[top] < 0.6 * len(border):
+        return None
+    return border[inverse.reshape(-1) == top].mean(0)
+
+
+def _drop_blends(px, background, min_share: float = 0.02):
+    """Remove anti-aliasing pixels: those lying on the line between the background and a solid ink color."""
+    import numpy as np
+
+    _, inverse, counts = np.unique((px // 24).astype(np.int32), axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    solids = [px[inverse == i].mean(0) for i in np.flatnonzero(counts >= max(4, min_share * len(px)))]
+    if not solids:
+        return px
+    blend = np.zeros(len(px), dtype=bool)
+    for ink in solids:
+        axis = ink - background
+        span = float((axis**2).sum())
+        if span < 900:
+            continue
+        t = ((px - background) @ axis) / span
+        residual = np.linalg.norm(px - (background + t[:, None] * axis), axis=1)
+        blend |= (t > 0.08) & (t < 0.85) & (residual < 24)
+    kept = px[~blend]
+    return kept if len(kept) >= 16 else px
+
+
+def _raster_palette(data: bytes, max_colors: int) -> list[str]:
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError:
+        logger.debug("numpy/Pillow not installed; skipping raster logo palette")
+        return []
+    img = Image.open(BytesIO(data))
+    img.draft("RGB", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+    img = img.convert("RGBA")
+    # Nearest-neighbour sampling: a smoothing filter would invent new edge blends.
+    img = img.resize(_sample_size(img.size), Image.NEAREST)
+    px = np.asarray(img, dtype=np.float32)
+    alpha = px[..., 3]
+    if (alpha < 250).any():
+        # Transparent logo: the alpha channel already separates ink from canvas; only keep opaque pixels.
+        opaque = alpha >= 250
+        fg = px[opaque][:, :3] if opaque.sum() >= 16 else px[alpha >= 128][:, :3]
+    else:
+        rgb = px[..., :3]
+        background = _border_background(rgb)
+        fg = rgb.reshape(-1, 3)
+        if background is not None:
+            ink = np.linalg.norm(fg - background, axis=1) > 24
+            if ink.sum() >= 16:
+                fg = _drop_blends(fg[ink], background)
+    if len(fg) == 0:
+        return []
+    return [c for c, _ in pixel_palette(fg, max_colors)]
+
+
+def _sample_size(size: tuple[int, int]) -> tuple[int, int]:
+    w, h = size
+    scale = min(1.0, SAMPLE_SIZE / max(w, h, 1))
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def pixel_palette(px, max_colors: int, min_share: float = 0.05) -> list[tuple[str, float]]:
+    """Dominant colors of an (n, 3) RGB float array as (hex, pixel share), largest cluster first."""
+    import numpy as np
+
+    centers, counts = _kmeans(px, min(max_colors, len(px)))
+    total = counts.sum()
+    ranked = [(rgb_to_hex(*centers[i]), counts[i] / total) for i in np.argsort(-counts) if counts[i] >= min_share * total]
+    kept = merge_palettes([c for c, _ in ranked], limit=max_colors, min_distance=60.0)
+    return [(c, round(float(share), 4)) for c, share in ranked if c in kept]
+
+
+def extract_logo_palette(data: bytes, content_type: str = "", max_colors: int = 5) -> list[str]:
+    """Ranked dominant hex colors of a logo; empty list when the image cannot be decoded."""
+    if not data or len(data) > MAX_LOGO_BYTES:
+        return []
+    try:
+        if is_svg(data, content_type):
+            return _svg_palette(data.decode("utf-8", errors="ignore"), max_colors)
+        return _raster_palette(data, max_colors)
+    except Exception as e:
+        logger.debug("Logo palette extraction failed: %s", e)
+        return []
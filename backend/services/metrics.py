@@ -0,0 +1,33 @@
+"""In-process per-step counters (token usage, latency, cost) for tuning the agents."""
+import threading
+from collections import defaultdict
+from typing import Any
+
+_lock = threading.Lock()
+_totals: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+_counts: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def record(step: str, **values: float) -> None:
+    """Add one sample per named value for a step, e.g. record("LogoGeneratorAgent.generate_concepts", latency_ms=812)."""
+    with _lock:
+        for key, value in values.items():
+            _totals[step][key] += float(value)
+            _counts[step][key] += 1
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    with _lock:
+        return {
+            step: {
+                key: {"n": _counts[step][key], "total": round(total, 4), "avg": round(total / max(_counts[step][key], 1), 4)}
+                for key, total in values.items()
+            }
+            for step, values in _totals.items()
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _totals.clear()
+        _counts.clear()
@@ -0,0 +1,130 @@
+"""Per-step model routing: each agent method runs on the fastest adequate tier and escalates on bad output."""
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Iterator
+
+from services import metrics
+from services.anthropic_client import CLAUDE_MODEL, response_text
+from services.profiling import stage
+
+logger = logging.getLogger(__name__)
+
+MODEL_TIERS: dict[str, str] = {
+    "fast": os.getenv("ANTHROPIC_MODEL_FAST", "claude-3-5-haiku-20241022"),
+    "standard": CLAUDE_MODEL,
+    "large": os.getenv("ANTHROPIC_MODEL_LARGE", "claude-opus-4-20250514"),
+}
+TIER_ORDER = ("fast", "standard", "large")
+# USD per million (input, output) tokens, for cost estimates only.
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "claude-3-5-haiku-20241022": (0.8, 4.0),
+    "claude-sonnet-4-20250514": (3.0, 15.0),
+    "claude-opus-4-20250514": (15.0, 75.0),
+}
+# Starting tier per agent method. Override with MODEL_ROUTES='{"AssetCreatorAgent.generate_prompt": "fast"}'.
+STEP_ROUTES: dict[str, str] = {
+    "BrandAnalyzer.analyze_website": "standard",
+    "AssetCreatorAgent.generate_prompt": "standard",
+    "AssetCreatorAgent.generate_prompt_variants": "standard",
+    "AssetCreatorAgent.generate_transform_prompt": "standard",
+    "AssetCreatorAgent.suggest_formats": "fast",
+    "LogoGeneratorAgent.analyze_strategy": "standard",
+    "LogoGeneratorAgent.generate_concepts": "fast",
+    "LogoGeneratorAgent.critique_and_rank": "standard",
+    "DesignSystemAgent.generate_guidance": "fast",
+}
+STEP_ROUTES.update(json.loads(os.getenv("MODEL_ROUTES", "{}") or "{}"))
+MAX_ESCALATIONS = int(os.getenv("MODEL_MAX_ESCALATIONS", "1"))
+# Truncated output is retried on the same tier with a larger max_tokens: a bigger model would cut off too.
+MAX_TRUNCATION_RETRIES = int(os.getenv("MODEL_MAX_TRUNCATION_RETRIES", "1"))
+MAX_OUTPUT_TOKENS = int(os.getenv("MODEL_MAX_OUTPUT_TOKENS", "8192"))
+
+
+def tier_for(step: str) -> str:
+    tier = STEP_ROUTES.get(step, "standard")
+    return tier if tier in MODEL_TIERS else "standard"
+
+
+def estimate_cost(model: str, usage: Any) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, MODEL_PRICES.get(CLAUDE_MODEL, (3.0, 15.0)))
+    tokens_in = getattr(usage, "input_tokens", 0) or 0
+    tokens_out = getattr(usage, "output_tokens", 0) or 0
+    return (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+
+
+def run_step(
+    client: Any,
+    step: str,
+    parse: Callable[[Any], Any] = response_text,
+    validate: Callable[[Any], bool] | None = None,
+    **create_kwargs: Any,
+) -> Any:
+    """Call Claude for one agent step on its routed tier. Truncated output (stop_reason max_tokens)
+    is retried on the same tier with double max_tokens; output failing `validate` (the confidence
+    check) is re-run one tier up. Returns the parsed output of the last attempt."""
+    tier_index = TIER_ORDER.index(tier_for(step))
+    escalations = 0
+    truncation_retries = 0
+    started = time.perf_counter()
+    cost = 0.0
+    while True:
+        model = MODEL_TIERS[TIER_ORDER[tier_index]]
+        t0 = time.perf_counter()
+        with stage(f"llm {step} ({model})"):
+            response = client.messages.create(model=model, **create_kwargs)
+        latency_ms = (time.perf_counter() - t0) * 1000
+        usage = getattr(response, "usage", None)
+        cost += estimate_cost(model, usage)
+        output = parse(response)
+        truncated = getattr(response, "stop_reason", None) == "max_tokens"
+        ok = not truncated and (validate is None or bool(validate(output)))
+        metrics.record(
+            f"{step}@{model}",
+            latency_ms=latency_ms,
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            invalid=0 if ok else 1,
+            truncated=1 if truncated else 0,
+        )
+        if ok:
+            break
+        max_tokens = create_kwargs.get("max_tokens", 0)
+        if truncated and truncation_retries < MAX_TRUNCATION_RETRIES and max_tokens < MAX_OUTPUT_TOKENS:
+            create_kwargs["max_tokens"] = min(max_tokens * 2, MAX_OUTPUT_TOKENS)
+            truncation_retries += 1
+            logger.info("%s: output from %s truncated; retrying with max_tokens=%d", step, model, create_kwargs["max_tokens"])
+            continue
+        if truncated or tier_index + 1 >= len(TIER_ORDER) or escalations >= MAX_ESCALATIONS:
+            break
+        logger.info("%s: output from %s failed validation; escalating", step, model)
+        tier_index += 1
+        escalations += 1
+    metrics.record(
+        step,
+        latency_ms=(time.perf_counter() - started) * 1000,
+        cost_usd=cost,
+        escalated=1 if escalations else 0,
+        invalid=0 if ok else 1,
+    )
+    return output
+
+
+def stream_step(client: Any, step: str, **create_kwargs: Any) -> Iterator[str]:
+    """Stream text deltas for one agent step on its routed tier. No escalation: callers validate
+    what arrived and retry the missing part through run_step."""
+    model = MODEL_TIERS[tier_for(step)]
+    t0 = time.perf_counter()
+    with stage(f"llm {step} ({model}, streamed)"), client.messages.stream(model=model, **create_kwargs) as stream:
+        yield from stream.text_stream
+        final = stream.get_final_message()
+    latency_ms = (time.perf_counter() - t0) * 1000
+    usage = getattr(final, "usage", None)
+    metrics.record(
+        f"{step}@{model}",
+        latency_ms=latency_ms,
+        input_tokens=getattr(usage, "input_tokens", 0) or 0,
+        output_tokens=getattr(usage, "output_tokens", 0) or 0,
+    )
+    metrics.record(step, latency_ms=latency_ms, cost_usd=estimate_cost(model, usage))
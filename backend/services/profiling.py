@@ -0,0 +1,117 @@
+"""Opt-in request profiling: a stage timeline plus a low-overhead stack sampler.
+
+`stage()` is a no-op unless a profile is active for the current request, so agents can be
+instrumented unconditionally. The sampler sees one thread (the event loop), not the request:
+concurrent requests share it, and off-loop work is only visible through stage timings.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+SAMPLE_INTERVAL_MS = 5.0
+MAX_STACK_DEPTH = 64
+SAMPLING_SCOPE = (
+    "event-loop thread only: includes any other request running concurrently on the loop; "
+    "work in asyncio.to_thread, threadpool (sync routes) or process pools is not sampled, see the timeline"
+)
+
+_active: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval_ms` from a daemon thread (no tracing hooks)."""
+
+    def __init__(self, thread_id: int, interval_ms: float = SAMPLE_INTERVAL_MS) -> None:
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join(timeout=1.0)
+
+    def summary(self, top: int = 25) -> dict[str, Any]:
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, n in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += n
+            for label in set(frames):
+                total[label] += n
+        pct = 100 / max(self.samples, 1)
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "scope": SAMPLING_SCOPE,
+            "top_functions": [
+                {"function": f, "self_pct": round(n * pct, 1), "total_pct": round(total[f] * pct, 1)} for f, n in own.most_common(top)
+            ],
+            "top_stacks": [{"stack": s, "samples": n} for s, n in self.stacks.most_common(top)],
+        }
+
+
+class RequestProfile:
+    def __init__(self, sample: bool = True, interval_ms: float = SAMPLE_INTERVAL_MS) -> None:
+        self.started = time.perf_counter()
+        self.timeline: list[dict[str, Any]] = []
+        self._sampler = StackSampler(threading.get_ident(), interval_ms) if sample else None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def __enter__(self) -> "RequestProfile":
+        self._token = _active.set(self)
+        if self._sampler:
+            self._sampler.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._sampler:
+            self._sampler.stop()
+        _active.reset(self._token)
+        self.wall_ms = self.elapsed_ms()
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "wall_ms": round(getattr(self, "wall_ms", self.elapsed_ms()), 2),
+            "timeline": self.timeline,
+            "sampling": self._sampler.summary() if self._sampler else None,
+        }
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Record a named stage (fetch, parse, extract, llm, post_process) on the active request profile."""
+    profile = _active.get()
+    if profile is None:
+        yield
+        return
+    start = profile.elapsed_ms()
+    try:
+        yield
+    finally:
+        profile.timeline.append({"stage": name, "start_ms": round(start, 2), "duration_ms": round(profile.elapsed_ms() - start, 2)})
@@ -0,0 +1,133 @@
+"""Token-budgeted prompt context: measure each section, keep the most informative content, serialize compactly."""
+import json
+import logging
+import math
+import os
+import re
+from typing import Any
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Claude tokenizes English prose at roughly 4 characters per token; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+DEFAULT_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "700"))
+# Keys the frontend (src/app/api/generate-assets/route.ts) and BrandAnalyzer actually send.
+PROFILE_PROMPT_KEYS = (
+    "name", "url", "tagline", "description", "target_audience", "style", "mood",
+    "primary_colors", "secondary_colors", "fonts", "logo_description",
+)
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\s*[\n|•·]\s*")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _prune(obj: Any, max_list: int, max_str: int) -> Any:
+    if isinstance(obj, dict):
+        out = {k: _prune(v, max_list, max_str) for k, v in obj.items()}
+        return {k: v for k, v in out.items() if v not in (None, "", [], {})}
+    if isinstance(obj, (list, tuple)):
+        return [_prune(v, max_list, max_str) for v in list(obj)[:max_list]]
+    if isinstance(obj, str):
+        obj = WHITESPACE_RE.sub(" ", obj).strip()
+        return obj if len(obj) <= max_str else obj[: max_str - 1].rstrip() + "…"
+    return obj
+
+
+def compact_json(obj: Any, max_list: int = 5, max_str: int = 300) -> str:
+    """Minified JSON without empty values, long lists or runaway strings (instead of Python str() of a dict)."""
+    return json.dumps(_prune(obj, max_list, max_str), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compact_profile(brand_profile: dict[str, Any], max_list: int = 4) -> str:
+    """The fields of a brand profile the prompts actually use, top-ranked colors first."""
+    subset = {k: brand_profile.get(k) for k in PROFILE_PROMPT_KEYS if k in brand_profile}
+    return compact_json(subset, max_list=max_list, max_str=200)
+
+
+def dedupe_sentences(texts: list[str], seen: set[str] | None = None) -> list[str]:
+    """Split into sentences and drop repeats (nav labels, footers and cookie banners repeat a lot)."""
+    seen = set() if seen is None else seen
+    out = []
+    for text in texts:
+        for sentence in SENTENCE_SPLIT_RE.split(text or ""):
+            sentence = WHITESPACE_RE.sub(" ", sentence).strip()
+            key = sentence.lower()
+            if len(sentence) < 3 or key in seen:
+                continue
+            seen.add(key)
+            out.append(sentence)
+    return out
+
+
+def _truncate_to_tokens(text: str, tokens: int) -> str:
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("; "))
+    return (cut[: boundary + 1] if boundary > limit // 2 else cut.rsplit(" ", 1)[0]) + " …"
+
+
+class ContextBuilder:
+    """Collect named sections with priorities, then emit as many as fit in the token budget.
+
+    Lower priority numbers are kept first; a section that does not fit whole is truncated at a
+    sentence boundary, and sections that would get less than `min_tokens` are dropped.
+    """
+
+    def __init__(self, budget: int = DEFAULT_BUDGET) -> None:
+        self.budget = budget
+        self._sections: list[tuple[int, int, str, str, int]] = []
+
+    def add(self, name: str, text: str, priority: int = 5, min_tokens: int = 12) -> "ContextBuilder":
+        text = (text or "").strip()
+        if text:
+            self._sections.append((priority, len(self._sections), name, text, min_tokens))
+        return self
+
+    def build(self) -> tuple[str, dict[str, int]]:
+        """Return the context text and per-section token costs (what was kept)."""
+        remaining = self.budget
+        kept: dict[int, tuple[str, str]] = {}
+        costs: dict[str, int] = {}
+        for priority, order, name, text, min_tokens in sorted(self._sections):
+            cost = estimate_tokens(text)
+            if cost > remaining:
+                if remaining < min_tokens:
+                    continue
+                text = _truncate_to_tokens(text, remaining)
+                cost = estimate_tokens(text)
+            kept[order] = (name, text)
+            costs[name] = cost
+            remaining -= cost
+        lines = [f"{name}: {text}" for _, (name, text) in sorted(kept.items())]
+        return "\n".join(lines), costs
+
+
+def record_context(step: str, raw: str, compact: str) -> None:
+    """Report the input-token reduction of one prompt against the text the naive version would have sent."""
+    raw_tokens = estimate_tokens(raw)
+    compact_tokens = estimate_tokens(compact)
+    metrics.record(step, raw_context_tokens=raw_tokens, context_tokens=compact_tokens)
+    logger.debug("%s context: %d -> %d tokens", step, raw_tokens, compact_tokens)
+
+
+def context_report() -> dict[str, dict[str, float]]:
+    """Per agent method: average context tokens before/after compaction and the reduction."""
+    report = {}
+    for step, values in metrics.snapshot().items():
+        raw, compact = values.get("raw_context_tokens"), values.get("context_tokens")
+        if not raw or not compact:
+            continue
+        report[step] = {
+            "prompts": raw["n"],
+            "avg_raw_tokens": raw["avg"],
+            "avg_context_tokens": compact["avg"],
+            "reduction_pct": round(100 * (1 - compact["total"] / raw["total"]), 1) if raw["total"] else 0.0,
+        }
+    return report
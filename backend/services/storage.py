@@ -0,0 +1,76 @@
+"""Local JSON storage for indexes the agents learn over time."""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+DATA_DIR = Path(os.getenv("BRAND_DATA_DIR", Path(__file__).resolve().parents[1] / "data"))
+
+
+def data_path(name: str) -> Path:
+    return DATA_DIR / name
+
+
+def load_json(path: Path, default: Any) -> Any:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Could not read %s: %s", path, e)
+        return default
+
+
+def save_json(path: Path, data: Any) -> None:
+    """Write atomically so a crash mid-write never leaves a truncated index."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not write %s: %s", path, e)
+
+
+def load_jsonl(path: Path) -> list[Any]:
+    rows = []
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt line in %s", path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Could not read %s: %s", path, e)
+    return rows
+
+
+def append_jsonl(path: Path, row: Any) -> None:
+    """Append-only log: O(1) per insert, replayed (last write wins) on load."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+    except OSError as e:
+        logger.warning("Could not append to %s: %s", path, e)
+
+
+def rewrite_jsonl(path: Path, rows: list[Any]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not write %s: %s", path, e)
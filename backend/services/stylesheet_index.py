@@ -0,0 +1,167 @@
+"""Fingerprint index of well-known framework stylesheets (Bootstrap, Tailwind, Font Awesome, CDN themes).
+
+Framework CSS mostly contributes default colors that pollute a brand palette, so matching
+sheets are skipped before download (URL patterns) or after download (content hash). The
+hash side is learned: a stylesheet whose exact bytes show up on several unrelated brands
+is treated as a library from then on. Non-library sheets keep a cached token summary so a
+repeat download is never regex-scanned twice. Brands are counted by registrable name, so one
+brand's own sheet served from acme.com, acme.de and acme.co.uk is not mistaken for a library.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from services.storage import data_path, load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+LEARN_THRESHOLD = int(os.getenv("STYLESHEET_LEARN_THRESHOLD", "3"))
+MAX_ENTRIES = 5000
+
+# Seed index: stylesheet URLs that are framework/library CSS and never brand-specific.
+LIBRARY_URL_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
+    ("bootstrap", re.compile(r"bootstrap(?:-grid|-reboot|-utilities|-icons)?(?:\.bundle)?(?:\.min)?\.css|/bootstrap@|/bootstrap/\d", re.I)),
+    ("tailwind", re.compile(r"tailwind(?:css)?(?:\.min)?\.css|/tailwindcss@", re.I)),
+    ("font-awesome", re.compile(r"font-?awesome|/fontawesome", re.I)),
+    ("bulma", re.compile(r"bulma(?:\.min)?\.css|/bulma@", re.I)),
+    ("foundation", re.compile(r"foundation(?:\.min)?\.css|/foundation-sites@", re.I)),
+    ("materialize", re.compile(r"materialize(?:\.min)?\.css", re.I)),
+    ("semantic-ui", re.compile(r"semantic(?:-ui)?(?:\.min)?\.css|/fomantic-ui", re.I)),
+    ("animate", re.compile(r"animate(?:\.min)?\.css|/animate\.css@", re.I)),
+    ("normalize", re.compile(r"normalize(?:\.min)?\.css|/normalize\.css@", re.I)),
+    ("jquery-ui", re.compile(r"jquery-ui(?:\.min)?(?:\.theme)?\.css|/jqueryui/", re.I)),
+    ("swiper", re.compile(r"swiper(?:-bundle)?(?:\.min)?\.css|/swiper@", re.I)),
+    ("slick", re.compile(r"slick(?:-theme)?(?:\.min)?\.css", re.I)),
+    ("aos", re.compile(r"/aos(?:\.min)?\.css|/aos@", re.I)),
+    ("wordpress-core", re.compile(r"/wp-includes/css/|/wp-block-library", re.I)),
+]
+GOOGLE_FONTS_RE = re.compile(r"fonts\.googleapis\.com/css2?", re.I)
+# Second-level labels of two-part country suffixes (acme.co.uk, acme.com.au).
+SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "edu", "ac", "ne", "or", "go", "gob", "nic"}
+
+_EMPTY_SUMMARY: dict[str, list[str]] = {"colors": [], "fonts": []}
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def site_domain(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def brand_name(domain: str) -> str:
+    """Registrable name without its public suffix: shop.acme.co.uk and acme.de both give "acme"."""
+    labels = [label for label in domain.lower().split(".") if label]
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return labels[-3]
+    return labels[-2] if len(labels) >= 2 else domain.lower()
+
+
+def _google_fonts_summary(url: str) -> dict[str, list[str]]:
+    """Google Fonts CSS only declares @font-face; the families are already in the URL."""
+    fonts: list[str] = []
+    for family in parse_qs(urlparse(url).query).get("family", []):
+        for name in family.split("|"):
+            name = name.split(":")[0].replace("+", " ").strip()
+            if name and name not in fonts:
+                fonts.append(name)
+    return {"colors": [], "fonts": fonts}
+
+
+class StylesheetIndex:
+    def __init__(self, path: Any = None, learn_threshold: int = LEARN_THRESHOLD) -> None:
+        self.path = path or data_path("stylesheet_index.json")
+        self.learn_threshold = learn_threshold
+        self._lock = threading.Lock()
+        self._dirty = False
+        stored = load_json(self.path, {})
+        self._entries: dict[str, dict[str, Any]] = stored.get("entries", {}) if isinstance(stored, dict) else {}
+        self._library_urls: dict[str, str] = stored.get("library_urls", {}) if isinstance(stored, dict) else {}
+        # Download counts only steer eviction; kept in memory so a repeat download never forces a save.
+        self._hits: dict[str, int] = {}
+        for entry in self._entries.values():
+            if "domains" in entry:
+                entry["brands"] = list(dict.fromkeys(brand_name(d) for d in entry.pop("domains")))
+            entry.pop("count", None)
+
+    def match_url(self, url: str) -> dict[str, Any] | None:
+        """Match before download. Returns {library, summary} or None when the sheet must be fetched."""
+        if GOOGLE_FONTS_RE.search(url):
+            return {"library": "google-fonts", "summary": _google_fonts_summary(url)}
+        path = urlparse(url)._replace(query="", fragment="").geturl()
+        for name, pattern in LIBRARY_URL_PATTERNS:
+            if pattern.search(path):
+                return {"library": name, "summary": _EMPTY_SUMMARY}
+        digest = self._library_urls.get(path)
+        if digest and digest in self._entries:
+            return {"library": self._entries[digest].get("library") or "learned", "summary": _EMPTY_SUMMARY}
+        return None
+
+    def match_content(self, digest: str) -> dict[str, Any] | None:
+        """Match after download by content hash: learned libraries are skipped, known sheets reuse their summary."""
+        entry = self._entries.get(digest)
+        if not entry:
+            return None
+        if entry.get("library"):
+            return {"library": entry["library"], "summary": _EMPTY_SUMMARY}
+        if entry.get("summary"):
+            return {"library": None, "summary": entry["summary"]}
+        return None
+
+    def record(self, digest: str, url: str, domain: str, summary: dict[str, list[str]]) -> None:
+        """Remember a downloaded sheet; promote it to a library once seen on enough distinct brands.
+
+        Only changes worth persisting (new sheet, new brand, newly learned library) mark the index dirty.
+        """
+        with self._lock:
+            self._hits[digest] = self._hits.get(digest, 0) + 1
+            entry = self._entries.get(digest)
+            if entry is None:
+                entry = self._entries[digest] = {"brands": [], "summary": summary, "library": None}
+                self._dirty = True
+            name = brand_name(domain) if domain else ""
+            if name and name not in entry["brands"] and len(entry["brands"]) < self.learn_threshold:
+                entry["brands"].append(name)
+                self._dirty = True
+            if not entry["library"] and len(entry["brands"]) >= self.learn_threshold:
+                entry["library"] = "learned"
+                entry["summary"] = {}
+                logger.info("Stylesheet %s learned as shared library (%s)", digest[:12], url)
+            if entry["library"]:
+                path = urlparse(url)._replace(query="", fragment="").geturl()
+                if self._library_urls.get(path) != digest:
+                    self._library_urls[path] = digest
+                    self._dirty = True
+            if len(self._entries) > MAX_ENTRIES:
+                self._evict()
+
+    def _evict(self) -> None:
+        keep = sorted(self._entries.items(), key=lambda kv: (bool(kv[1].get("library")), self._hits.get(kv[0], 0)), reverse=True)
+        self._entries = dict(keep[: MAX_ENTRIES * 9 // 10])
+        self._library_urls = {u: d for u, d in self._library_urls.items() if d in self._entries}
+        self._hits = {d: n for d, n in self._hits.items() if d in self._entries}
+
+    def save(self) -> None:
+        """Write the index if it changed; blocking, so call it via asyncio.to_thread from async code."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {"entries": dict(self._entries), "library_urls": dict(self._library_urls)}
+            self._dirty = False
+        save_json(self.path, snapshot)
+
+
+_index: StylesheetIndex | None = None
+
+
+def get_stylesheet_index() -> StylesheetIndex:
+    global _index
+    if _index is None:
+        _index = StylesheetIndex()
+    return _index
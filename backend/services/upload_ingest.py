@@ -0,0 +1,218 @@
+"""Streaming image upload ingestion: spool to disk with limits enforced as bytes arrive, then decode
+once off the event loop (process pool) into a thumbnail pyramid and a brand-aware palette.
+
+The spooled original is deleted as soon as it has been decoded; the pyramid is kept for
+UPLOAD_TTL_HOURS (default 24) and swept on later uploads."""
+import asyncio
+import logging
+import math
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from services.color import hex_to_lab
+from services.storage import data_path
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+MAX_UPLOAD_PIXELS = int(os.getenv("UPLOAD_MAX_PIXELS", str(60_000_000)))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+PYRAMID_SIZES = (1024, 512, 256, 128)
+ON_BRAND_DELTA_E = 20.0
+UPLOAD_TTL_SECONDS = float(os.getenv("UPLOAD_TTL_HOURS", "24")) * 3600
+SWEEP_INTERVAL_SECONDS = 600
+EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def upload_dir(upload_id: str) -> Path:
+    return data_path(f"uploads/{upload_id}")
+
+
+def sweep_uploads(max_age: float = UPLOAD_TTL_SECONDS) -> int:
+    """Delete upload folders older than max_age seconds; returns how many were removed."""
+    root = data_path("uploads")
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        folders = list(root.iterdir())
+    except FileNotFoundError:
+        return 0
+    for folder in folders:
+        try:
+            if folder.is_dir() and folder.stat().st_mtime < cutoff:
+                shutil.rmtree(folder, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info("Swept %d expired uploads", removed)
+    return removed
+
+
+_last_sweep = 0.0
+
+
+async def _maybe_sweep() -> None:
+    global _last_sweep
+    if time.monotonic() - _last_sweep < SWEEP_INTERVAL_SECONDS:
+        return
+    _last_sweep = time.monotonic()
+    await asyncio.to_thread(sweep_uploads)
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], content_type: str = "", content_length: str | None = None) -> dict[str, Any]:
+    """Write the request body to disk chunk by chunk; reject oversize or non-image bodies before they finish arriving."""
+    declared = (content_type or "").split(";")[0].strip().lower()
+    if declared and declared not in EXTENSIONS and declared != "application/octet-stream":
+        raise UploadRejected(415, f"Unsupported Content-Type {declared}; send image/jpeg, image/png or image/webp")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise UploadRejected(413, f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+
+    await _maybe_sweep()
+    upload_id = uuid.uuid4().hex
+    folder = upload_dir(upload_id)
+    folder.mkdir(parents=True, exist_ok=True)
+    spool = folder / "upload.part"
+    size, mime, head = 0, None, b""
+    try:
+        with spool.open("wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadRejected(413, f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+                if mime is None:
+                    head += chunk[: 16 - len(head)]
+                    if len(head) >= 12:
+                        mime = sniff_image_type(head)
+                        if mime is None:
+                            raise UploadRejected(415, "Body is not a JPEG, PNG or WebP image")
+                f.write(chunk)
+        if mime is None:
+            raise UploadRejected(400, "Empty or truncated upload")
+        original = folder / f"original.{EXTENSIONS[mime]}"
+        spool.rename(original)
+    except BaseException:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+    return {"upload_id": upload_id, "path": str(original), "size": size, "mime": mime}
+
+
+def _nearest_brand_color(lab: tuple[float, float, float], brand: list[tuple[str, tuple[float, float, float]]]) -> tuple[str | None, float]:
+    best, best_d = None, math.inf
+    for hex_color, brand_lab in brand:
+        d = math.dist(lab, brand_lab)
+        if d < best_d:
+            best, best_d = hex_color, d
+    return best, best_d
+
+
+def process_upload(path: str, brand_colors: list[str]) -> dict[str, Any]:
+    """Decode once (JPEG draft mode scales down during decode), apply the EXIF orientation, build the
+    pyramid from the decoded image, and measure the palette against the brand colors. Runs in a
+    worker process; the original file is removed once decoded."""
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    from services.logo_palette import pixel_palette
+
+    Image.MAX_IMAGE_PIXELS = MAX_UPLOAD_PIXELS
+    folder = Path(path).parent
+    with Image.open(path) as img:
+        width, height = img.size
+        if width * height > MAX_UPLOAD_PIXELS:
+            raise Image.DecompressionBombError(f"{width}x{height} exceeds {MAX_UPLOAD_PIXELS} pixels")
+        # EXIF orientations 5-8 rotate by 90 degrees (phone portrait shots): report the displayed size.
+        if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            width, height = height, width
+        img.draft("RGB", (PYRAMID_SIZES[0], PYRAMID_SIZES[0]))
+        decoded = ImageOps.exif_transpose(img)
+    Path(path).unlink(missing_ok=True)
+    # Transparent cutouts: flatten onto white for the JPEG pyramid, measure only the opaque pixels.
+    rgba = decoded.convert("RGBA") if decoded.mode in ("RGBA", "LA", "PA") or "transparency" in decoded.info else None
+    if rgba is not None:
+        level = Image.new("RGB", rgba.size, (255, 255, 255))
+        level.paste(rgba, mask=rgba.getchannel("A"))
+    else:
+        level = decoded.convert("RGB")
+    pyramid = []
+    for size in PYRAMID_SIZES:
+        level.thumbnail((size, size))
+        out = folder / f"{size}.jpg"
+        level.save(out, "JPEG", quality=85)
+        pyramid.append({"size": size, "width": level.width, "height": level.height, "file": out.name})
+
+    px = np.asarray(level, dtype=np.float32).reshape(-1, 3)
+    if rgba is not None:
+        rgba.thumbnail(level.size)
+        alpha = np.asarray(rgba.getchannel("A")).reshape(-1)
+        opaque = alpha >= 250 if (alpha >= 250).sum() >= 16 else alpha >= 128
+        if opaque.sum():
+            px = np.asarray(rgba.convert("RGB"), dtype=np.float32).reshape(-1, 3)[opaque]
+    brand = [(c, lab) for c in brand_colors if (lab := hex_to_lab(c))]
+    palette = []
+    on_brand = 0.0
+    for hex_color, share in pixel_palette(px, max_colors=6, min_share=0.03):
+        entry: dict[str, Any] = {"hex": hex_color, "share": share}
+        if brand:
+            nearest, delta_e = _nearest_brand_color(hex_to_lab(hex_color), brand)
+            entry.update({"nearest_brand_color": nearest, "delta_e": round(delta_e, 1)})
+            if delta_e <= ON_BRAND_DELTA_E:
+                on_brand += share
+        palette.append(entry)
+    g = math.gcd(width, height) or 1
+    return {
+        "width": width,
+        "height": height,
+        "aspect": f"{width // g}:{height // g}",
+        "orientation": "square" if width == height else "portrait" if height > width else "landscape",
+        "brightness": round(float(px.mean()) / 255, 3),
+        "palette": palette,
+        "on_brand_share": round(on_brand, 3) if brand else None,
+        "pyramid": pyramid,
+    }
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=UPLOAD_WORKERS)
+    return _pool
+
+
+async def describe_upload(upload: dict[str, Any], brand_colors: list[str]) -> dict[str, Any]:
+    """Run the heavy decode in the process pool so the event loop keeps serving other requests."""
+    from PIL import Image
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_process_pool(), process_upload, upload["path"], brand_colors)
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        shutil.rmtree(Path(upload["path"]).parent, ignore_errors=True)
+        raise UploadRejected(422, f"Could not decode image: {e}")